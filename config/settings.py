@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import sys
 from datetime import timedelta
 from pathlib import Path
 
@@ -50,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "materials.metrics.MetricsMiddleware",
+    "materials.profiling.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -139,13 +142,29 @@ NULLABLE = {'null': True, 'blank': True}
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'materials.paginators.DefaultPagination',
     'PAGE_SIZE': 10,
+    # JSON через orjson, без него — стандартные классы DRF
+    'DEFAULT_RENDERER_CLASSES': [
+        'materials.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'materials.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Token bucket materials.throttling: ёмкость ведра / период пополнения
+    'DEFAULT_THROTTLE_RATES': {
+        'payments': config('THROTTLE_RATE_PAYMENTS', default='10/min'),
+        'subscriptions': config('THROTTLE_RATE_SUBSCRIPTIONS', default='30/min'),
+        'subscriptions_bulk': config('THROTTLE_RATE_SUBSCRIPTIONS_BULK', default='10/min'),
+    },
 
 }
 
@@ -154,6 +173,9 @@ SIMPLE_JWT = {
         minutes=config('JWT_ACCESS_TOKEN_LIFETIME_MINUTES', default=60, cast=int)),
     'REFRESH_TOKEN_LIFETIME': timedelta(
         days=config('JWT_REFRESH_TOKEN_LIFETIME_DAYS', default=1, cast=int)),
+    # Роли и версия токенов в claims: проверка прав обходится без запросов к группам
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.RoleTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.RoleTokenRefreshSerializer',
 }
 
 # Настройки Stripe
@@ -168,6 +190,12 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=config('EMAIL_HOST_USER'))
+# Писем в одной пачке рассылки об обновлении курса
+NOTIFICATION_CHUNK_SIZE = config('NOTIFICATION_CHUNK_SIZE', default=100, cast=int)
+# Подписчиков в одной задаче Celery при рассылке об обновлении курса
+NOTIFICATION_TASK_CHUNK_SIZE = config('NOTIFICATION_TASK_CHUNK_SIZE', default=5000, cast=int)
+# Окно сбора изменений курса в одно письмо, в секундах
+NOTIFICATION_DEBOUNCE_SECONDS = config('NOTIFICATION_DEBOUNCE_SECONDS', default=4 * 60 * 60, cast=int)
 
 import os
 
@@ -184,6 +212,11 @@ LOGGING = {
             'class': 'logging.FileHandler',
             'filename': LOG_DIR / 'error.log',
         },
+        'slow_requests': {
+            'level': 'WARNING',
+            'class': 'logging.FileHandler',
+            'filename': LOG_DIR / 'slow_requests.log',
+        },
     },
     'loggers': {
         'django': {
@@ -191,16 +224,53 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': True,
         },
+        'materials.profiling': {
+            'handlers': ['slow_requests'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
 
+# Профилирование запросов: доля запросов в выборке (0 - выключено),
+# порог медленного запроса в мс и число SQL-запросов в записи лога
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_SLOW_REQUEST_MS = config('PROFILING_SLOW_REQUEST_MS', default=500, cast=int)
+PROFILING_TOP_QUERIES = config('PROFILING_TOP_QUERIES', default=5, cast=int)
+
+# Bearer-токен для /metrics/; без него метрики доступны только сотрудникам (is_staff)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
 # Настройки Celery
 CELERY_BROKER_URL = f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', '6379')}/{os.getenv('REDIS_DB', '0')}"
 CELERY_RESULT_BACKEND = CELERY_BROKER_URL
+# Redis для ограничения частоты запросов
+THROTTLE_REDIS_URL = f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', '6379')}/{os.getenv('REDIS_THROTTLE_DB', '2')}"
+# Redis для окон и списков изменений курсов перед рассылкой
+NOTIFICATION_REDIS_URL = f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', '6379')}/{os.getenv('REDIS_NOTIFICATION_DB', '3')}"
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
+# Рассылка планируется на конец окна: задача с countdown дольше visibility_timeout
+# брокер выдал бы повторно
+CELERY_BROKER_TRANSPORT_OPTIONS = {'visibility_timeout': NOTIFICATION_DEBOUNCE_SECONDS + 60 * 60}
+
+# Настройки кэша (Redis, отдельная от Celery база)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', '6379')}/{os.getenv('REDIS_CACHE_DB', '1')}",
+    }
+}
+# Тесты не пишут в общий Redis и не зависят от его доступности; тесты кэша
+# включают LocMemCache через override_settings
+if 'test' in sys.argv[1:2]:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+# Время жизни записей кэша каталога курсов, в секундах
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=300, cast=int)
+# Время жизни пользователя в кэше JWT-аутентификации, в секундах
+USER_CACHE_TIMEOUT = config('USER_CACHE_TIMEOUT', default=60, cast=int)
 
 # Настройки Celery Beat
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
\ No newline at end of file
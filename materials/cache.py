@@ -0,0 +1,132 @@
+"""
+Версионированный кэш ответов каталога курсов.
+
+В кэше хранится только общая для всех пользователей часть ответа. Версия
+каталога увеличивается сигналами при сохранении и удалении курсов и уроков,
+поэтому старые записи просто перестают читаться и истекают по таймауту.
+Поля, зависящие от пользователя, и часто меняющийся счётчик подписчиков
+добавляются после чтения из кэша.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = 'catalog:version'
+# Время последнего удаления курса: Max(updated_at) после удаления уменьшается
+CATALOG_DELETED_KEY = 'catalog:deleted_at'
+
+# Поля CourseSerializer, которые не кэшируются, в порядке вывода
+LIVE_FIELDS = ('subscribers_count', 'is_subscribed', 'is_owner')
+
+
+def get_catalog_version():
+    """Текущая версия каталога."""
+    try:
+        version = cache.get(CATALOG_VERSION_KEY)
+        if version is None:
+            cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+            version = cache.get(CATALOG_VERSION_KEY, 1)
+        return version
+    except Exception as e:
+        logger.warning('Кэш каталога недоступен: %s', e)
+        return None
+
+
+def bump_catalog_version():
+    """Делает недействительными все закэшированные ответы каталога."""
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        # Ключа версии ещё нет: следующая версия начнётся с 2
+        cache.add(CATALOG_VERSION_KEY, 2, timeout=None)
+    except Exception as e:
+        logger.warning('Кэш каталога недоступен: %s', e)
+
+
+def touch_catalog_deleted():
+    """Запоминает время удаления курсов для Last-Modified списка."""
+    try:
+        cache.set(CATALOG_DELETED_KEY, timezone.now(), timeout=None)
+    except Exception as e:
+        logger.warning('Кэш каталога недоступен: %s', e)
+
+
+def get_catalog_deleted_at():
+    try:
+        return cache.get(CATALOG_DELETED_KEY)
+    except Exception as e:
+        logger.warning('Кэш каталога недоступен: %s', e)
+        return None
+
+
+def make_catalog_key(version, scope, request):
+    """Ключ кэша для ответа на запрос в пределах версии каталога."""
+    digest = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'catalog:{version}:{scope}:{digest}'
+
+
+def get_or_build(scope, request, build):
+    """
+    Возвращает закэшированную запись или строит её вызовом build().
+
+    При недоступном кэше запись просто строится заново.
+    """
+    version = get_catalog_version()
+    if version is None:
+        CACHE_LOOKUPS.labels(scope, 'error').inc()
+        return build()
+
+    key = make_catalog_key(version, scope, request)
+    try:
+        entry = cache.get(key)
+    except Exception as e:
+        logger.warning('Кэш каталога недоступен: %s', e)
+        CACHE_LOOKUPS.labels(scope, 'error').inc()
+        return build()
+    if entry is not None:
+        CACHE_LOOKUPS.labels(scope, 'hit').inc()
+        return entry
+
+    CACHE_LOOKUPS.labels(scope, 'miss').inc()
+
+    entry = build()
+    try:
+        cache.set(key, entry, timeout=settings.CATALOG_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.warning('Кэш каталога недоступен: %s', e)
+    return entry
+
+
+def add_live_fields(items, course_ids, owner_ids, user, fields):
+    """Добавляет к закэшированным курсам subscribers_count, is_subscribed и is_owner."""
+    wanted = [name for name in LIVE_FIELDS if fields is None or name in fields]
+    if not wanted:
+        return items
+
+    live = {}
+    if course_ids and ('subscribers_count' in wanted or 'is_subscribed' in wanted):
+        from .models import Course
+
+        rows = (
+            Course.objects.filter(id__in=course_ids).with_is_subscribed(user)
+            .values_list('id', 'subscribers_count', 'is_subscribed')
+        )
+        live = {course_id: (count, subscribed) for course_id, count, subscribed in rows}
+
+    for item, course_id, owner_id in zip(items, course_ids, owner_ids):
+        subscribers_count, is_subscribed = live.get(course_id, (0, False))
+        for name in wanted:
+            if name == 'subscribers_count':
+                item[name] = subscribers_count
+            elif name == 'is_subscribed':
+                item[name] = is_subscribed
+            else:
+                item[name] = owner_id is not None and owner_id == user.id
+    return items
@@ -0,0 +1,73 @@
+"""
+Потоковая выгрузка платежей в NDJSON и CSV.
+
+Строки читаются серверным курсором (.iterator) пачками по chunk_size и сразу
+отдаются потребителю, поэтому память не зависит от числа платежей.
+"""
+import csv
+import json
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Столбцы выгрузки и соответствующие им поля values()
+EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('user_id', 'user_id'),
+    ('user_email', 'user__email'),
+    ('course_id', 'course_id'),
+    ('course', 'course__title'),
+    ('amount', 'amount'),
+    ('status', 'status'),
+    ('session_id', 'session_id'),
+    ('payment_link', 'payment_link'),
+    ('created_at', 'created_at'),
+)
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def export_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Платежи в виде словарей; курс и пользователь подтягиваются JOIN-ом в том же запросе."""
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    rows = queryset.order_by('id').values_list(*lookups).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield {column: value for (column, _), value in zip(EXPORT_COLUMNS, row)}
+
+
+def _plain(value):
+    if value is None:
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, (int, str)):
+        return value
+    return str(value)
+
+
+def iter_ndjson(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    for row in export_rows(queryset, chunk_size):
+        yield json.dumps({column: _plain(value) for column, value in row.items()},
+                         ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """Буфер для csv.writer, который просто возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([column for column, _ in EXPORT_COLUMNS])
+    for row in export_rows(queryset, chunk_size):
+        yield writer.writerow(['' if value is None else _plain(value) for value in row.values()])
+
+
+def iter_export(queryset, export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    if export_format == 'csv':
+        return iter_csv(queryset, chunk_size)
+    return iter_ndjson(queryset, chunk_size)
@@ -0,0 +1,148 @@
+import json
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from materials.models import Course, CourseSubscription, Lesson, Payment
+
+User = get_user_model()
+
+
+def get_scenarios(course_id, lesson_id):
+    """Читающие запросы к основным маршрутам: повторяемы и не меняют данные."""
+    return {
+        'course-list': ('/api/courses/', {}),
+        'course-list-popular': ('/api/courses/', {'ordering': 'popular'}),
+        'course-list-cursor': ('/api/courses/', {'pagination': 'cursor'}),
+        'course-list-fields': ('/api/courses/', {'fields': 'id,title,lessons_count'}),
+        'course-detail': (f'/api/courses/{course_id}/', {}),
+        'lesson-list': ('/api/lessons/', {}),
+        'lesson-list-cursor': ('/api/lessons/', {'pagination': 'cursor'}),
+        'lesson-detail': (f'/api/lessons/{lesson_id}/', {}),
+        'catalog-search': ('/api/search/', {'q': 'курс'}),
+        'payment-list': ('/api/payment/', {}),
+        'subscription-list': ('/api/subscriptions/', {}),
+    }
+
+
+def percentile(quantiles, value):
+    return round(quantiles[value - 1], 3)
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный замер основных маршрутов API внутри процесса: p50/p95/p99, '
+            'запросы к базе и пропускная способность, результат в JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Число замеряемых запросов на маршрут')
+        parser.add_argument('--warmup', type=int, default=10, help='Число прогревочных запросов на маршрут')
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help='Замерять только этот сценарий (можно повторять)')
+        parser.add_argument('--user', help='Email пользователя, от имени которого идут запросы')
+        parser.add_argument('--output', help='Файл для результата в JSON, по умолчанию stdout')
+
+    def get_user(self, email):
+        users = User.objects.filter(is_active=True).order_by('id')
+        if email:
+            user = users.filter(email=email).first()
+        else:
+            # По умолчанию пользователь с подписками и платежами, чтобы списки не были пустыми
+            with_data = users.filter(subscriptions__isnull=False, materials_payments__isnull=False)
+            user = with_data.first() or users.first()
+        if user is None:
+            raise CommandError('Нет активного пользователя: заполните базу командой seed_lms')
+        return user
+
+    def measure(self, client, path, params, requests, warmup):
+        for _ in range(warmup):
+            client.get(path, params)
+
+        latencies = []
+        queries = 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                request_started = time.perf_counter()
+                response = client.get(path, params)
+                latencies.append((time.perf_counter() - request_started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f'{path}: ответ {response.status_code}')
+            queries += len(captured)
+        elapsed = time.perf_counter() - started
+
+        quantiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        return {
+            'requests': requests,
+            'p50_ms': percentile(quantiles, 50),
+            'p95_ms': percentile(quantiles, 95),
+            'p99_ms': percentile(quantiles, 99),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'queries_per_request': round(queries / requests, 2),
+            'throughput_rps': round(requests / elapsed, 1),
+        }
+
+    def get_revision(self):
+        try:
+            return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                  check=True, cwd=settings.BASE_DIR).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2 or options['warmup'] < 0:
+            raise CommandError('Нужно хотя бы 2 замеряемых запроса и неотрицательный прогрев')
+
+        user = self.get_user(options['user'])
+        course = Course.objects.order_by('-lessons_count', 'id').first()
+        lesson = Lesson.objects.order_by('id').first()
+        if course is None or lesson is None:
+            raise CommandError('Нет курсов или уроков: заполните базу командой seed_lms')
+
+        scenarios = get_scenarios(course.id, lesson.id)
+        selected = options['scenarios'] or list(scenarios)
+        unknown = set(selected) - set(scenarios)
+        if unknown:
+            raise CommandError(f'Неизвестные сценарии: {", ".join(sorted(unknown))}')
+
+        # Запросы проходят полный путь, включая JWT-аутентификацию
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name in selected:
+                path, params = scenarios[name]
+                results[name] = self.measure(client, path, params, options['requests'], options['warmup'])
+                self.stderr.write(f'{name}: p50 {results[name]["p50_ms"]} мс, '
+                                  f'p99 {results[name]["p99_ms"]} мс')
+
+        report = json.dumps({
+            'created_at': timezone.now().isoformat(),
+            'revision': self.get_revision(),
+            'user_id': user.id,
+            'requests': options['requests'],
+            'warmup': options['warmup'],
+            'dataset': {
+                'users': User.objects.count(),
+                'courses': Course.objects.count(),
+                'lessons': Lesson.objects.count(),
+                'subscriptions': CourseSubscription.objects.count(),
+                'payments': Payment.objects.count(),
+            },
+            'scenarios': results,
+        }, ensure_ascii=False, indent=2)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(report + '\n')
+        else:
+            self.stdout.write(report)
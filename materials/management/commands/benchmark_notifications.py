@@ -0,0 +1,127 @@
+import socketserver
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from materials.models import Course, CourseSubscription
+from materials.tasks import send_course_update_chunk
+
+User = get_user_model()
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает и отбрасывает письма."""
+
+    def reply(self, line):
+        self.wfile.write(line + b'\r\n')
+
+    def handle(self):
+        # Задержка имитирует установку TCP и TLS до реального SMTP-сервера
+        time.sleep(self.server.handshake_delay)
+        self.server.count('connections')
+        self.reply(b'220 sink ESMTP')
+        for line in self.rfile:
+            command = line[:4].upper()
+            if command == b'DATA':
+                self.reply(b'354 End data with <CR><LF>.<CR><LF>')
+                for data_line in self.rfile:
+                    if data_line == b'.\r\n':
+                        break
+                self.server.count('messages')
+                self.reply(b'250 OK')
+            elif command == b'QUIT':
+                self.reply(b'221 Bye')
+                return
+            else:
+                self.reply(b'250 OK')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handshake_delay):
+        super().__init__(('127.0.0.1', 0), SMTPSinkHandler)
+        self.handshake_delay = handshake_delay
+        self.stats = {'connections': 0, 'messages': 0}
+        self.lock = threading.Lock()
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def reset(self):
+        with self.lock:
+            self.stats = {'connections': 0, 'messages': 0}
+
+
+def send_one_by_one(course_id, course_title):
+    """Прежняя рассылка: подписчик загружается отдельно, письмо — через своё соединение."""
+    subscriptions = CourseSubscription.objects.filter(course_id=course_id)
+    for subscription in subscriptions:
+        user = subscription.user
+        send_mail(
+            f'Обновление в курсе "{course_title}"',
+            f'Здравствуйте, {user.email}!\n\nВ курсе "{course_title}", на который вы подписаны, '
+            f'появилось обновление.\n\nС уважением,\nКоманда LMS',
+            settings.DEFAULT_FROM_EMAIL,
+            [user.email],
+            fail_silently=False,
+        )
+    return subscriptions.count()
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает прежнюю и пакетную рассылку об обновлении курса на локальном SMTP-сервере'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscribers', type=int, default=500, help='Число подписчиков курса')
+        parser.add_argument('--handshake-ms', type=float, default=5.0,
+                            help='Задержка установки каждого SMTP-соединения, мс')
+
+    def run(self, sink, name, send, course):
+        sink.reset()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            send(course.id, course.title)
+            elapsed = time.perf_counter() - started
+        self.stdout.write(f'{name}: {elapsed:.2f} с, SMTP-соединений: {sink.stats["connections"]}, '
+                          f'писем: {sink.stats["messages"]}, SQL-запросов: {len(queries)}')
+
+    def handle(self, *args, **options):
+        if options['subscribers'] < 1 or options['handshake_ms'] < 0:
+            raise CommandError('Нужен хотя бы один подписчик и неотрицательная задержка')
+
+        sink = SMTPSink(options['handshake_ms'] / 1000)
+        threading.Thread(target=sink.serve_forever, daemon=True).start()
+        email_settings = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend', EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=sink.server_address[1], EMAIL_USE_TLS=False, EMAIL_USE_SSL=False,
+            EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+        )
+
+        # Данные создаются во временной транзакции и откатываются в конце
+        try:
+            with email_settings, transaction.atomic():
+                course = Course.objects.create(title='Курс для замера', description='Описание')
+                users = User.objects.bulk_create(
+                    User(email=f'benchmark-{i}@example.com', first_name=f'Имя {i}')
+                    for i in range(options['subscribers'])
+                )
+                CourseSubscription.objects.bulk_create(
+                    CourseSubscription(user=user, course=course) for user in users
+                )
+
+                self.run(sink, 'По одному письму', send_one_by_one, course)
+                self.run(sink, f'Пачками по {settings.NOTIFICATION_CHUNK_SIZE}',
+                         send_course_update_chunk, course)
+                transaction.set_rollback(True)
+        finally:
+            sink.shutdown()
+            sink.server_close()
@@ -0,0 +1,45 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from materials.models import Course, Lesson
+from materials.renderers import FastJSONRenderer
+from materials.serializers import CourseSerializer
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает JSONRenderer DRF и FastJSONRenderer на ответе CourseSerializer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', type=int, default=100, help='Число курсов в ответе')
+        parser.add_argument('--lessons', type=int, default=20, help='Число уроков в каждом курсе')
+        parser.add_argument('--number', type=int, default=50, help='Число рендеров в одном замере')
+
+    def handle(self, *args, **options):
+        request = Request(APIRequestFactory().get('/api/courses/'))
+        fields = set(CourseSerializer.Meta.fields) - {'is_subscribed', 'is_owner'}
+
+        # Данные создаются во временной транзакции и откатываются в конце
+        with transaction.atomic():
+            courses = Course.objects.bulk_create(
+                Course(title=f'Курс {i}', description='Описание курса ' * 10, price='1990.50')
+                for i in range(options['courses'])
+            )
+            Lesson.objects.bulk_create(
+                Lesson(title=f'Урок {j}', description='Описание урока ' * 10, course=course,
+                       video_url='https://www.youtube.com/watch?v=benchmark')
+                for course in courses for j in range(options['lessons'])
+            )
+            queryset = Course.objects.filter(id__in=[course.id for course in courses]).with_lessons().order_by('id')
+            data = CourseSerializer(queryset, many=True, context={'request': request, 'fields': fields}).data
+            transaction.set_rollback(True)
+
+        size = len(JSONRenderer().render(data))
+        self.stdout.write(f'Размер ответа: {size / 1024:.0f} КБ')
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            best = min(timeit.repeat(lambda: renderer.render(data), number=options['number'], repeat=3))
+            self.stdout.write(f'{type(renderer).__name__}: {best / options["number"] * 1000:.2f} мс на рендер')
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from materials.models import Course, Lesson
+from materials.row_serializers import CourseRowSerializer, LessonRowSerializer
+from materials.serializers import CourseSerializer, LessonSerializer
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает сериализаторы DRF и быстрый путь на values() для списков курсов и уроков'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Число уроков (курсов в 10 раз меньше)')
+        parser.add_argument('--repeat', type=int, default=3, help='Число повторов, берётся лучшее время')
+
+    def measure(self, repeat, serialize):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            serialize()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        request = Request(APIRequestFactory().get('/api/lessons/'))
+
+        # Данные создаются во временной транзакции и откатываются в конце
+        with transaction.atomic():
+            courses = Course.objects.bulk_create(
+                Course(title=f'Курс {i}', description='Описание курса') for i in range(max(rows // 10, 1))
+            )
+            Lesson.objects.bulk_create(
+                Lesson(title=f'Урок {i}', description='Описание урока', course=courses[i % len(courses)],
+                       video_url='https://www.youtube.com/watch?v=benchmark')
+                for i in range(rows)
+            )
+            course_ids = [course.id for course in courses]
+            lessons = Lesson.objects.filter(course_id__in=course_ids).order_by('course_id', 'id')
+            catalog = Course.objects.filter(id__in=course_ids)
+
+            # Поля, зависящие от пользователя, в бенчмарке не нужны
+            course_fields = set(CourseSerializer.Meta.fields) - {'is_subscribed', 'is_owner'}
+            lesson_rows = LessonRowSerializer(request=request)
+            course_rows = CourseRowSerializer(course_fields, request)
+            results = [
+                ('Уроки, LessonSerializer', lambda: LessonSerializer(
+                    lessons, many=True, context={'request': request}).data),
+                ('Уроки, LessonRowSerializer', lambda: lesson_rows.serialize(
+                    lessons.values(*lesson_rows.columns))),
+                ('Курсы с уроками, CourseSerializer', lambda: CourseSerializer(
+                    catalog.with_lessons().order_by('id'), many=True,
+                    context={'request': request, 'fields': course_fields}).data),
+                ('Курсы с уроками, CourseRowSerializer', lambda: course_rows.serialize(
+                    catalog.order_by('id').values(*course_rows.columns))),
+            ]
+            for title, serialize in results:
+                self.stdout.write(f'{title}: {self.measure(repeat, serialize):.1f} мс')
+
+            transaction.set_rollback(True)
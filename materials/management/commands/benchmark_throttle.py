@@ -0,0 +1,69 @@
+import statistics
+import time
+from unittest import mock
+
+import redis
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from materials.throttling import TOKEN_BUCKET_SCRIPT, TokenBucketThrottle, get_bucket_script
+from materials.views import CourseSubscriptionView
+
+
+class Command(BaseCommand):
+    help = 'Замеряет накладные расходы TokenBucketThrottle на одну проверку'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=2000, help='Число замеряемых проверок')
+        parser.add_argument('--users', type=int, default=100, help='Число пользователей (вёдер)')
+        parser.add_argument('--fake', action='store_true',
+                            help='fakeredis в процессе вместо THROTTLE_REDIS_URL: только стоимость скрипта')
+
+    def get_script(self, fake):
+        if not fake:
+            return get_bucket_script()
+        try:
+            import fakeredis
+        except ImportError:
+            raise CommandError('Для --fake нужен пакет fakeredis (requirements-dev.txt)')
+        return fakeredis.FakeRedis().register_script(TOKEN_BUCKET_SCRIPT)
+
+    def handle(self, *args, **options):
+        if options['checks'] < 2 or options['users'] < 1:
+            raise CommandError('Нужно хотя бы 2 проверки и 1 пользователь')
+
+        view = CourseSubscriptionView()
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(view.throttle_scope)
+        factory = APIRequestFactory()
+        # Пользователи без записи в базе: throttle нужен только pk
+        users = [mock.Mock(pk=-i, is_authenticated=True) for i in range(1, options['users'] + 1)]
+        requests = []
+        for user in users:
+            request = factory.post('/api/subscription/')
+            force_authenticate(request, user=user)
+            requests.append(Request(request))
+
+        script = self.get_script(options['fake'])
+        try:
+            # Прогрев: соединение и загрузка скрипта; throttle ошибки Redis скрывает
+            script(keys=['throttle:benchmark'], args=[1, 1, 0])
+        except redis.RedisError as e:
+            raise CommandError(f'Redis недоступен: {e}')
+
+        latencies = []
+        denied = 0
+        with mock.patch('materials.throttling.get_bucket_script', return_value=script):
+            for i in range(options['checks']):
+                request = requests[i % len(requests)]
+                started = time.perf_counter()
+                allowed = TokenBucketThrottle().allow_request(request, view)
+                latencies.append((time.perf_counter() - started) * 1_000_000)
+                denied += not allowed
+
+        quantiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        self.stdout.write(f'Лимит {view.throttle_scope}: {rate}, вёдер: {len(users)}, '
+                          f'проверок: {options["checks"]}, отказов: {denied}')
+        self.stdout.write(f'p50 {quantiles[49]:.0f} мкс, p95 {quantiles[94]:.0f} мкс, '
+                          f'p99 {quantiles[98]:.0f} мкс, среднее {statistics.fmean(latencies):.0f} мкс')
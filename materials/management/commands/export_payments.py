@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from materials.exports import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, iter_export
+from materials.models import Payment
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка платежей в NDJSON или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='export_format', choices=sorted(EXPORT_FORMATS),
+                            default='ndjson', help='Формат выгрузки')
+        parser.add_argument('--user', type=int, help='Только платежи пользователя с этим ID')
+        parser.add_argument('--output', help='Файл для записи, по умолчанию stdout')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help='Размер пачки серверного курсора')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным')
+
+        payments = Payment.objects.all()
+        if options['user'] is not None:
+            payments = payments.filter(user_id=options['user'])
+
+        chunks = iter_export(payments, options['export_format'], options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
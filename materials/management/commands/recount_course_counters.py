@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from materials.cache import bump_catalog_version
+from materials.models import Course, CourseSubscription, Lesson, count_subquery
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает lessons_count и subscribers_count курсов, исправляя расхождения'
+
+    def handle(self, *args, **options):
+        drifted = Course.objects.annotate(
+            actual_lessons=count_subquery(Lesson),
+            actual_subscribers=count_subquery(CourseSubscription),
+        ).filter(
+            ~Q(lessons_count=F('actual_lessons')) | ~Q(subscribers_count=F('actual_subscribers'))
+        ).values_list('id', flat=True)
+
+        fixed = Course.objects.filter(id__in=list(drifted)).recount_counters()
+        if fixed:
+            bump_catalog_version()
+
+        self.stdout.write(self.style.SUCCESS(f'Исправлены счётчики курсов: {fixed}'))
@@ -0,0 +1,92 @@
+import random
+import secrets
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from materials.models import Course, CourseSubscription, Lesson, Payment
+
+User = get_user_model()
+
+VIDEO_URL = 'https://www.youtube.com/watch?v=seed'
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу синтетическими пользователями, курсами, уроками, подписками и платежами'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Число пользователей')
+        parser.add_argument('--courses', type=int, default=200, help='Число курсов')
+        parser.add_argument('--lessons-per-course', type=int, default=10, help='Уроков в каждом курсе')
+        parser.add_argument('--subscriptions-per-user', type=int, default=5,
+                            help='Подписок у каждого пользователя (не больше числа курсов)')
+        parser.add_argument('--payments', type=int, default=2000, help='Число платежей')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Размер пачки bulk_create')
+        parser.add_argument('--password', default='password', help='Пароль всех созданных пользователей')
+        parser.add_argument('--random-seed', type=int, help='Зерно генератора для повторяемых данных')
+
+    def handle(self, *args, **options):
+        counts = [options[name] for name in ('users', 'courses', 'lessons_per_course',
+                                             'subscriptions_per_user', 'payments')]
+        if min(counts) < 0 or options['batch_size'] < 1:
+            raise CommandError('Объёмы должны быть неотрицательными, размер пачки - положительным')
+        needs_links = options['subscriptions_per_user'] or options['payments']
+        if needs_links and not (options['users'] and options['courses']):
+            raise CommandError('Для подписок и платежей нужны пользователи и курсы')
+
+        rng = random.Random(options['random_seed'])
+        # Метка запуска делает email и ID сессий уникальными при повторном заполнении
+        token = secrets.token_hex(4)
+        batch_size = options['batch_size']
+
+        with transaction.atomic():
+            # Пароль хешируется один раз: хеширование дороже вставки
+            password = make_password(options['password'])
+            users = User.objects.bulk_create(
+                (User(email=f'seed-{token}-{i}@example.com', password=password, phone='+70000000000',
+                      city='Москва') for i in range(options['users'])),
+                batch_size=batch_size,
+            )
+            user_ids = [user.id for user in users]
+
+            courses = Course.objects.bulk_create(
+                (Course(title=f'Курс {i}', description=f'Описание курса {i}', price=rng.randint(1, 100) * 100,
+                        rating=rng.randint(1, 5), owner_id=rng.choice(user_ids) if user_ids else None)
+                 for i in range(options['courses'])),
+                batch_size=batch_size,
+            )
+            course_ids = [course.id for course in courses]
+
+            Lesson.objects.bulk_create(
+                (Lesson(title=f'Урок {j}', description=f'Описание урока {j} курса {course.title}',
+                        video_url=VIDEO_URL, course=course, owner_id=course.owner_id)
+                 for course in courses for j in range(options['lessons_per_course'])),
+                batch_size=batch_size,
+            )
+
+            per_user = min(options['subscriptions_per_user'], len(course_ids))
+            CourseSubscription.objects.bulk_create(
+                (CourseSubscription(user_id=user_id, course_id=course_id)
+                 for user_id in user_ids for course_id in rng.sample(course_ids, per_user)),
+                batch_size=batch_size,
+            )
+
+            Payment.objects.bulk_create(
+                (Payment(user_id=rng.choice(user_ids), course_id=rng.choice(course_ids),
+                         amount=rng.randint(1, 100) * 100, session_id=f'cs_seed_{token}_{i}',
+                         status=rng.choice(Payment.PAYMENT_STATUS)[0])
+                 for i in range(options['payments'])),
+                batch_size=batch_size,
+            )
+
+            # bulk_create не отправляет сигналы: счётчики курсов и кэш обновляются пересчётом
+            call_command('recount_course_counters', stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(user_ids)}, курсов {len(course_ids)}, '
+            f'уроков {len(course_ids) * options["lessons_per_course"]}, '
+            f'подписок {len(user_ids) * per_user}, платежей {options["payments"]}'
+        ))
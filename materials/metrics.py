@@ -0,0 +1,119 @@
+"""
+Метрики Prometheus: запросы к API, SQL, кэш каталога и задачи Celery.
+
+Запись метрики — обновление счётчика в памяти процесса, поэтому
+MetricsMiddleware включена постоянно. Для gunicorn с несколькими
+воркерами и Celery prefork переменная окружения PROMETHEUS_MULTIPROC_DIR
+должна указывать на общий для всех процессов пустой каталог и быть задана
+до их запуска: тогда каждый процесс пишет значения в свои файлы, а
+metrics_view суммирует их. Без переменной отдаются метрики текущего
+процесса.
+"""
+import os
+import time
+from contextlib import ExitStack
+
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+
+REQUEST_LATENCY = Histogram(
+    'lms_http_request_duration_seconds', 'Длительность обработки запроса',
+    ['view', 'method', 'status'],
+)
+REQUEST_QUERIES = Histogram(
+    'lms_http_request_db_queries', 'Число SQL-запросов на один запрос',
+    ['view'], buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 64),
+)
+CACHE_LOOKUPS = Counter(
+    'lms_cache_lookups_total', 'Обращения к кэшу каталога: hit, miss или error',
+    ['scope', 'result'],
+)
+TASK_DURATION = Histogram(
+    'lms_celery_task_duration_seconds', 'Длительность выполнения задачи Celery',
+    ['task'], buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+TASK_RESULTS = Counter(
+    'lms_celery_tasks_total', 'Завершённые задачи Celery по состоянию',
+    ['task', 'state'],
+)
+
+
+class QueryCounter:
+    """execute_wrapper, считающий SQL-запросы."""
+    __slots__ = ('count',)
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """Длительность и число SQL-запросов по имени маршрута."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        # Имя маршрута вместо пути, чтобы число рядов не зависело от ID в URL
+        match = request.resolver_match
+        view = match.view_name if match is not None else 'unresolved'
+        REQUEST_LATENCY.labels(view, request.method, f'{response.status_code // 100}xx').observe(duration)
+        REQUEST_QUERIES.labels(view).observe(counter.count)
+        return response
+
+
+def get_registry():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view(request):
+    """
+    Метрики в текстовом формате Prometheus.
+
+    При METRICS_TOKEN нужен Bearer-токен, без него — сессия сотрудника
+    (is_staff): по умолчанию эндпоинт закрыт.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        allowed = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        allowed = request.user.is_authenticated and request.user.is_staff
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+_task_started = {}
+
+
+@task_prerun.connect
+def task_started(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def task_finished(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_DURATION.labels(task.name).observe(time.perf_counter() - started)
+    TASK_RESULTS.labels(task.name, (state or 'unknown').lower()).inc()
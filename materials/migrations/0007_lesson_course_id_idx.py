@@ -0,0 +1,19 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("materials", "0006_course_last_notification_sent"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(fields=["course", "id"], name="lesson_course_id_idx"),
+        ),
+    ]
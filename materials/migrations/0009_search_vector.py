@@ -0,0 +1,72 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:59
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+SEARCH_VECTOR_TRIGGER_SQL = """
+CREATE FUNCTION materials_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('pg_catalog.russian', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.russian', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER materials_course_search_vector
+    BEFORE INSERT OR UPDATE OF title, description ON materials_course
+    FOR EACH ROW EXECUTE FUNCTION materials_search_vector_update();
+
+CREATE TRIGGER materials_lesson_search_vector
+    BEFORE INSERT OR UPDATE OF title, description ON materials_lesson
+    FOR EACH ROW EXECUTE FUNCTION materials_search_vector_update();
+
+UPDATE materials_course SET title = title;
+UPDATE materials_lesson SET title = title;
+"""
+
+DROP_SEARCH_VECTOR_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS materials_course_search_vector ON materials_course;
+DROP TRIGGER IF EXISTS materials_lesson_search_vector ON materials_lesson;
+DROP FUNCTION IF EXISTS materials_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("materials", "0008_course_updated_at_lesson_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                blank=True, editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                blank=True, editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="course",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="course_search_vector_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="lesson_search_vector_idx"
+            ),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_TRIGGER_SQL, DROP_SEARCH_VECTOR_TRIGGER_SQL),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+FILL_COUNTERS_SQL = """
+UPDATE materials_course SET
+    lessons_count = (
+        SELECT COUNT(*) FROM materials_lesson WHERE materials_lesson.course_id = materials_course.id
+    ),
+    subscribers_count = (
+        SELECT COUNT(*) FROM materials_coursesubscription
+        WHERE materials_coursesubscription.course_id = materials_course.id
+    );
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("materials", "0009_search_vector"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="lessons_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество уроков"
+            ),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="subscribers_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество подписчиков"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(
+                fields=["-subscribers_count", "-id"], name="course_popularity_idx"
+            ),
+        ),
+        migrations.RunSQL(FILL_COUNTERS_SQL, migrations.RunSQL.noop),
+    ]
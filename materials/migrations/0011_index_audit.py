@@ -0,0 +1,61 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("materials", "0010_course_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Новые индексы создаются до удаления одиночных индексов внешних ключей
+        migrations.AddIndex(
+            model_name="coursesubscription",
+            index=models.Index(
+                fields=["course", "user"], name="subscription_course_user_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["user", "-created_at"], name="payment_user_created_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="coursesubscription",
+            name="course",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="subscriptions",
+                to="materials.course",
+                verbose_name="Курс",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="payment",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="materials_payments",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        # Пустые ID сессий нарушили бы уникальность
+        migrations.RunSQL(
+            "UPDATE materials_payment SET session_id = NULL WHERE session_id = '';",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name="payment",
+            constraint=models.UniqueConstraint(
+                fields=("session_id",), name="payment_session_id_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("materials", "0011_index_audit"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Новые индексы создаются до удаления одиночных индексов внешних ключей
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(fields=["owner", "id"], name="course_owner_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(
+                fields=["owner", "course", "id"], name="lesson_owner_course_id_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="course",
+            name="owner",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Владелец курса",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="lesson",
+            name="owner",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Владелец курса",
+            ),
+        ),
+    ]
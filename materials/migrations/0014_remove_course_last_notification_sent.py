@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:43
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("materials", "0013_subscription_user_created_index"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="course",
+            name="last_notification_sent",
+        ),
+    ]
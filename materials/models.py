@@ -1,23 +1,101 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import connection, models
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 
 from config import settings
 from config.settings import NULLABLE
 
 
+class SearchVectorDeferredManager(models.Manager):
+    """Не загружает search_vector, пока он не запрошен явно."""
+
+    def get_queryset(self):
+        return super().get_queryset().defer('search_vector')
+
+
+def count_subquery(model):
+    """Число связанных с курсом записей одним подзапросом."""
+    counts = (
+        model.objects.filter(course=OuterRef('pk')).order_by()
+        .values('course').annotate(total=Count('id')).values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class CourseQuerySet(models.QuerySet):
+    """Выборка курсов с аннотациями для сериализатора каталога."""
+
+    def with_is_subscribed(self, user):
+        if user is None or not user.is_authenticated:
+            return self.annotate(is_subscribed=Value(False))
+        subscriptions = CourseSubscription.objects.filter(course=OuterRef('pk'), user=user)
+        return self.annotate(is_subscribed=Exists(subscriptions))
+
+    def with_lessons(self):
+        return self.prefetch_related(Prefetch('lessons', queryset=Lesson.objects.order_by('id')))
+
+    def shift_counters(self, **counters):
+        """
+        Одним UPDATE сдвигает счётчики курсов через F() и обновляет дату их изменения.
+
+        Пример: Course.objects.filter(pk=course_id).shift_counters(lessons_count=1).
+        """
+        changes = {name: Greatest(F(name) + delta, 0) for name, delta in counters.items()}
+        return self.update(updated_at=timezone.now(), **changes)
+
+    def recount_counters(self):
+        """Одним UPDATE пересчитывает счётчики курсов по фактическим урокам и подпискам."""
+        return self.update(
+            lessons_count=count_subquery(Lesson),
+            subscribers_count=count_subquery(CourseSubscription),
+            updated_at=timezone.now(),
+        )
+
+    def popular(self):
+        """Сортировка по числу подписчиков, использует индекс course_popularity_idx."""
+        return self.order_by('-subscribers_count', '-id')
+
+    def for_catalog(self, user, fields=None):
+        """
+        Курсы со всем, что читает CourseSerializer, за постоянное число запросов.
+
+        Если передан набор запрошенных полей, аннотации и prefetch добавляются
+        только для тех из них, что попали в выборку.
+        """
+        queryset = self
+        if fields is None or 'is_subscribed' in fields:
+            queryset = queryset.with_is_subscribed(user)
+        if fields is None or 'lessons' in fields:
+            queryset = queryset.with_lessons()
+        return queryset.order_by('id')
+
+
 class Course(models.Model):
     title = models.CharField(max_length=150, verbose_name='Название')
     preview = models.ImageField(upload_to='courses/', verbose_name='Превью', **NULLABLE)
     description = models.TextField(verbose_name='Описание')
+    # Отдельный индекс не нужен: owner_id ведёт в course_owner_id_idx
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
-                              verbose_name='Владелец курса', **NULLABLE)
+                              verbose_name='Владелец курса', db_index=False, **NULLABLE)
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name='цена')
 
     rating = models.IntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)],
         verbose_name='Оценка', default=0
     )
-    last_notification_sent = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения')
+    # Заполняется триггером materials_search_vector_update
+    search_vector = SearchVectorField(editable=False, **NULLABLE)
+    # Счётчики обновляются сигналами через F(), пересчёт: manage.py recount_course_counters
+    lessons_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество уроков')
+    subscribers_count = models.PositiveIntegerField(default=0, editable=False,
+                                                    verbose_name='Количество подписчиков')
+
+    objects = SearchVectorDeferredManager.from_queryset(CourseQuerySet)()
 
     def __str__(self):
         return self.title
@@ -25,6 +103,12 @@ class Course(models.Model):
     class Meta:
         verbose_name = 'Курс'
         verbose_name_plural = 'Курсы'
+        indexes = [
+            GinIndex(fields=['search_vector'], name='course_search_vector_idx'),
+            models.Index(fields=['-subscribers_count', '-id'], name='course_popularity_idx'),
+            # Права на уровне выборки и ?owner=me в порядке списка
+            models.Index(fields=['owner', 'id'], name='course_owner_id_idx'),
+        ]
 
 
 class Lesson(models.Model):
@@ -33,8 +117,21 @@ class Lesson(models.Model):
     description = models.TextField(verbose_name='Описание')
     preview = models.ImageField(upload_to='lessons/', verbose_name='Превью', **NULLABLE)
     video_url = models.URLField(verbose_name='Ссылка на видео')
+    # Отдельный индекс не нужен: owner_id ведёт в lesson_owner_course_id_idx
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
-                              verbose_name='Владелец курса', **NULLABLE)
+                              verbose_name='Владелец курса', db_index=False, **NULLABLE)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата изменения')
+    # Заполняется триггером materials_search_vector_update
+    search_vector = SearchVectorField(editable=False, **NULLABLE)
+
+    objects = SearchVectorDeferredManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Курс на момент загрузки: перенос урока сдвигает счётчики обоих курсов
+        instance._loaded_course_id = instance.__dict__.get('course_id')
+        return instance
 
     def __str__(self):
         return self.title
@@ -42,19 +139,137 @@ class Lesson(models.Model):
     class Meta:
         verbose_name = 'Урок'
         verbose_name_plural = 'Уроки'
+        indexes = [
+            # Порядок keyset-пагинации списка уроков
+            models.Index(fields=['course', 'id'], name='lesson_course_id_idx'),
+            models.Index(fields=['owner', 'course', 'id'], name='lesson_owner_course_id_idx'),
+            GinIndex(fields=['search_vector'], name='lesson_search_vector_idx'),
+        ]
+
+
+class CourseSubscriptionManager(models.Manager):
+    """
+    Изменение подписок одним SQL-запросом вместе с subscribers_count курсов.
+
+    Запросы идут мимо ORM: сигналы post_save и post_delete не отправляются,
+    счётчики сдвигаются тем же запросом.
+    """
+    # deleted и inserted видят один снимок данных, поэтому вставка выполняется,
+    # только если удалять было нечего. Курс проверяется выборкой в INSERT.
+    TOGGLE_SQL = """
+        WITH deleted AS (
+            DELETE FROM {subscription} WHERE {user_id} = %(user_id)s AND {course_id} = %(course_id)s
+            RETURNING 1
+        ), inserted AS (
+            INSERT INTO {subscription} ({user_id}, {course_id}, {created_at})
+            SELECT %(user_id)s, {id}, %(now)s FROM {course}
+            WHERE {id} = %(course_id)s AND NOT EXISTS (SELECT 1 FROM deleted)
+            ON CONFLICT ({user_id}, {course_id}) DO NOTHING
+            RETURNING 1
+        ), shifted AS (
+            UPDATE {course}
+            SET {subscribers_count} = GREATEST(
+                    {subscribers_count} + (SELECT count(*) FROM inserted) - (SELECT count(*) FROM deleted), 0
+                ),
+                {updated_at} = %(now)s
+            WHERE {id} = %(course_id)s AND EXISTS (SELECT 1 FROM deleted UNION ALL SELECT 1 FROM inserted)
+        )
+        SELECT (SELECT count(*) FROM deleted), (SELECT count(*) FROM inserted),
+               EXISTS (SELECT 1 FROM {course} WHERE {id} = %(course_id)s)
+    """
+    # Курсы блокируются по возрастанию id, чтобы пакеты с общими курсами не взаимоблокировались
+    SUBSCRIBE_MANY_SQL = """
+        WITH inserted AS (
+            INSERT INTO {subscription} ({user_id}, {course_id}, {created_at})
+            SELECT %(user_id)s, {id}, %(now)s FROM {course}
+            WHERE {id} = ANY(%(course_ids)s) ORDER BY {id}
+            ON CONFLICT ({user_id}, {course_id}) DO NOTHING
+            RETURNING {course_id}
+        ), locked AS (
+            SELECT {id} FROM {course} WHERE {id} IN (SELECT {course_id} FROM inserted) ORDER BY {id} FOR UPDATE
+        ), shifted AS (
+            UPDATE {course} SET {subscribers_count} = {subscribers_count} + 1, {updated_at} = %(now)s
+            WHERE {id} IN (SELECT {id} FROM locked)
+        )
+        SELECT ARRAY(SELECT {course_id} FROM inserted ORDER BY {course_id}),
+               ARRAY(SELECT {id} FROM {course} WHERE {id} = ANY(%(course_ids)s) ORDER BY {id})
+    """
+    UNSUBSCRIBE_MANY_SQL = """
+        WITH deleted AS (
+            DELETE FROM {subscription} WHERE {user_id} = %(user_id)s AND {course_id} = ANY(%(course_ids)s)
+            RETURNING {course_id}
+        ), locked AS (
+            SELECT {id} FROM {course} WHERE {id} IN (SELECT {course_id} FROM deleted) ORDER BY {id} FOR UPDATE
+        ), shifted AS (
+            UPDATE {course} SET {subscribers_count} = GREATEST({subscribers_count} - 1, 0), {updated_at} = %(now)s
+            WHERE {id} IN (SELECT {id} FROM locked)
+        )
+        SELECT ARRAY(SELECT {course_id} FROM deleted ORDER BY {course_id})
+    """
+
+    def _execute(self, sql, params):
+        quote = connection.ops.quote_name
+        sql = sql.format(
+            subscription=quote(self.model._meta.db_table),
+            course=quote(Course._meta.db_table),
+            **{name: quote(name) for name in ('id', 'user_id', 'course_id', 'created_at',
+                                               'subscribers_count', 'updated_at')},
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {**params, 'now': timezone.now()})
+            return cursor.fetchone()
+
+    def toggle(self, user_id, course_id):
+        """
+        Переключает подписку пользователя на курс.
+
+        Возвращает True, если подписка добавлена или уже добавлена
+        параллельным запросом, False, если удалена, и None, если курса нет.
+        """
+        deleted, inserted, course_exists = self._execute(
+            self.TOGGLE_SQL, {'user_id': user_id, 'course_id': course_id}
+        )
+        if deleted:
+            return False
+        if inserted or course_exists:
+            return True
+        return None
+
+    def subscribe_many(self, user_id, course_ids):
+        """
+        Подписывает пользователя на курсы, уже оформленные подписки пропускаются.
+
+        Возвращает ID курсов с новыми подписками и ID существующих курсов.
+        """
+        return self._execute(self.SUBSCRIBE_MANY_SQL, {'user_id': user_id, 'course_ids': list(course_ids)})
+
+    def unsubscribe_many(self, user_id, course_ids):
+        """Удаляет подписки пользователя на курсы, возвращает ID курсов с удалёнными подписками."""
+        deleted, = self._execute(self.UNSUBSCRIBE_MANY_SQL, {'user_id': user_id, 'course_ids': list(course_ids)})
+        return deleted
 
 
 class CourseSubscription(models.Model):
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+    # Отдельный индекс не нужен: user_id ведёт в уникальный индекс (user, course)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False,
                              verbose_name='Пользователь', related_name='subscriptions')
-    course = models.ForeignKey(Course, on_delete=models.CASCADE,
+    # Отдельный индекс не нужен: course_id ведёт в subscription_course_user_idx
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, db_index=False,
                                verbose_name='Курс', related_name='subscriptions')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата подписки')
 
+    objects = CourseSubscriptionManager()
+
     class Meta:
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
         unique_together = ['user', 'course']
+        indexes = [
+            # Подписчики курса для рассылки уведомлений
+            models.Index(fields=['course', 'user'], name='subscription_course_user_idx'),
+            # Подписки пользователя в порядке keyset-пагинации /api/subscriptions/
+            models.Index(fields=['user', 'created_at', 'id'], name='subscription_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} подписан на {self.course.title}"
@@ -69,7 +284,8 @@ class Payment(models.Model):
         ('canceled', 'Отменен'),
     )
 
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+    # Отдельный индекс не нужен: user_id ведёт в payment_user_created_idx
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False,
                              related_name='materials_payments')
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='materials_payments')
     amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Сумма оплаты")
@@ -84,4 +300,12 @@ class Payment(models.Model):
 
     class Meta:
         verbose_name = "Платеж"
-        verbose_name_plural = "Платежи"
\ No newline at end of file
+        verbose_name_plural = "Платежи"
+        indexes = [
+            # Платежи пользователя, новые первыми
+            models.Index(fields=['user', '-created_at'], name='payment_user_created_idx'),
+        ]
+        constraints = [
+            # NULL не считаются совпадающими, поэтому платежи без сессии не мешают
+            models.UniqueConstraint(fields=['session_id'], name='payment_session_id_uniq'),
+        ]
\ No newline at end of file
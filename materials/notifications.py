@@ -0,0 +1,116 @@
+"""
+Сбор изменений курса в одно уведомление подписчикам.
+
+Первое изменение курса открывает окно NOTIFICATION_DEBOUNCE_SECONDS: ключ
+окна ставится в Redis атомарно (SET NX EX), и на конец окна планируется
+flush_course_changes. Изменения внутри окна только дописываются в список
+курса, поэтому подписчики получают одно письмо со сводкой всех правок, а
+путь редактирования не пишет в базу. При недоступном Redis уведомление
+пропускается: правка не должна падать из-за рассылки.
+"""
+import json
+import logging
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+from .tasks import flush_course_changes
+
+logger = logging.getLogger(__name__)
+
+# Таймаут Redis в секундах: медленный Redis не должен задерживать правки
+REDIS_TIMEOUT = 0.25
+
+# Строк сводки в письме, остальные изменения только подсчитываются
+DIGEST_LIMIT = 20
+
+
+@lru_cache(maxsize=None)
+def get_redis():
+    return redis.Redis.from_url(settings.NOTIFICATION_REDIS_URL, socket_timeout=REDIS_TIMEOUT,
+                                socket_connect_timeout=REDIS_TIMEOUT)
+
+
+def get_window_key(course_id):
+    return f'notify:window:{course_id}'
+
+
+def get_changes_key(course_id):
+    return f'notify:changes:{course_id}'
+
+
+def describe_change(instance, fields):
+    """Изменение курса или урока: ключ объекта, название и названия изменённых полей."""
+    opts = instance._meta
+    return {
+        'key': f'{opts.model_name}:{instance.pk}',
+        'object': str(opts.verbose_name),
+        'title': instance.title,
+        'fields': [str(opts.get_field(name).verbose_name).lower() for name in fields],
+    }
+
+
+def record_course_change(course_id, change):
+    """
+    Дописывает изменение в список курса и открывает окно, если его нет.
+
+    Одна транзакция Redis: RPUSH, EXPIRE и SET NX EX. Рассылка планируется
+    только тем, кто открыл окно. Возвращает True, если окно открыто этим
+    вызовом.
+    """
+    window = settings.NOTIFICATION_DEBOUNCE_SECONDS
+    changes_key = get_changes_key(course_id)
+    try:
+        pipe = get_redis().pipeline()
+        pipe.rpush(changes_key, json.dumps(change, ensure_ascii=False))
+        # Список переживает окно, если рассылка задержалась в очереди
+        pipe.expire(changes_key, window * 2)
+        pipe.set(get_window_key(course_id), 1, nx=True, ex=window)
+        *_, opened = pipe.execute()
+    except redis.RedisError as e:
+        logger.warning('Redis уведомлений недоступен, изменение курса %s не учтено: %s', course_id, e)
+        return False
+
+    if opened:
+        flush_course_changes.apply_async((course_id,), countdown=window)
+    return bool(opened)
+
+
+def pop_course_changes(course_id):
+    """
+    Забирает накопленные изменения и закрывает окно одной транзакцией.
+
+    Изменение, записанное после этого, откроет новое окно, поэтому ни одна
+    правка не теряется.
+    """
+    changes_key = get_changes_key(course_id)
+    pipe = get_redis().pipeline()
+    pipe.lrange(changes_key, 0, -1)
+    pipe.delete(changes_key, get_window_key(course_id))
+    items, _ = pipe.execute()
+    return [json.loads(item) for item in items]
+
+
+def build_digest(changes):
+    """
+    Строки сводки: по одной на объект в порядке первого изменения.
+
+    Поля повторных правок объединяются, название берётся из последней.
+    """
+    merged = {}
+    for change in changes:
+        entry = merged.setdefault(change['key'], {**change, 'fields': []})
+        entry['title'] = change['title']
+        entry['fields'] += [name for name in change['fields'] if name not in entry['fields']]
+
+    lines = []
+    for entry in merged.values():
+        line = f'{entry["object"]} "{entry["title"]}"'
+        if entry['fields']:
+            line += f': {", ".join(entry["fields"])}'
+        lines.append(line)
+
+    if len(lines) > DIGEST_LIMIT:
+        lines = lines[:DIGEST_LIMIT] + [f'и ещё изменений: {len(lines) - DIGEST_LIMIT}']
+    return lines
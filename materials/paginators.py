@@ -1,6 +1,145 @@
+import base64
+import binascii
+import datetime
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetModeMixin:
+    """
+    Режим keyset-пагинации, включаемый параметром ?pagination=cursor.
+
+    Следующая страница выбирается условием по последней записи предыдущей
+    страницы вместо OFFSET и без COUNT(*). Порядок задаётся атрибутом
+    keyset_ordering представления, поля порядка должны быть уникальны в сумме;
+    префикс «-» задаёт убывание.
+    """
+    pagination_mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    keyset_ordering = ('id',)
+    invalid_cursor_message = 'Неверный курсор'
+    # True — только keyset-режим, без номеров страниц
+    keyset_only = False
+
+    keyset = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.keyset_only or request.query_params.get(self.pagination_mode_query_param) == 'cursor'
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.ordering = tuple(getattr(view, 'keyset_ordering', self.keyset_ordering))
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.keyset_page = rows[:page_size]
+        return self.keyset_page
+
+    def get_position_filter(self, position):
+        """Условие «строго после позиции» для составного порядка."""
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{field.lstrip("-")}__{lookup}': position[index]})
+            for previous, value in zip(self.ordering[:index], position[:index]):
+                step &= Q(**{previous.lstrip('-'): value})
+            condition |= step
+        return condition
+
+    def decode_cursor(self, request, model):
+        """
+        Позиция из параметра cursor, приведённая к типам полей порядка.
+
+        Курсор приходит от клиента, поэтому любое несоответствие — 404, а не
+        ошибка при построении запроса.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [self.decode_value(model, field, value) for field, value in zip(self.ordering, position)]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
 
-class MaterialsPagination(PageNumberPagination):
+    @staticmethod
+    def decode_value(model, field, value):
+        if value is None or isinstance(value, (list, dict)):
+            raise ValueError(value)
+        return model._meta.get_field(field.lstrip('-')).to_python(value)
+
+    def encode_cursor(self, row):
+        # Страница может состоять из экземпляров моделей или строк values()
+        if isinstance(row, dict):
+            position = [row[field.lstrip('-')] for field in self.ordering]
+        else:
+            position = [getattr(row, field.lstrip('-')) for field in self.ordering]
+        encoded = json.dumps(position, default=self.encode_value)
+        return base64.urlsafe_b64encode(encoded.encode('ascii')).decode('ascii')
+
+    @staticmethod
+    def encode_value(value):
+        # Даты с микросекундами: DjangoJSONEncoder обрезал бы их до миллисекунд
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        raise TypeError(f'Значение {type(value).__name__} не поддерживается в курсоре')
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.keyset_page[-1]))
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+
+class DefaultPagination(KeysetModeMixin, PageNumberPagination):
+    """Пагинация по умолчанию (PAGE_SIZE из настроек) с режимом ?pagination=cursor."""
+
+
+class MaterialsPagination(KeysetModeMixin, PageNumberPagination):
     page_size = 5  # количество элементов на странице по умолчанию
     page_size_query_param = 'page_size'  # параметр для изменения размера страницы
-    max_page_size = 20  # максимальное количество элементов на странице
\ No newline at end of file
+    max_page_size = 20  # максимальное количество элементов на странице
+
+
+class SubscriptionPagination(KeysetModeMixin, PageNumberPagination):
+    """Подписки пользователя: всегда keyset-пагинация."""
+    keyset_only = True
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class SearchPagination(PageNumberPagination):
+    """Постраничная выдача результатов поиска, отсортированных по релевантности."""
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
@@ -0,0 +1,40 @@
+"""
+Парсер JSON на orjson.
+
+orjson принимает только UTF-8, поэтому тела в другой кодировке и
+окружение без orjson обрабатываются стандартным JSONParser. Целые шире
+64 бит orjson 3.8 читает как float с потерей точности, а более новые
+версии отвергают, поэтому тела с длинными числами и тела, которые orjson
+не разобрал, тоже передаются JSONParser: результат и ошибки совпадают с ним.
+"""
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+# Не меньше 19 цифр подряд: такое целое может не поместиться в 64 бита.
+# Совпадение внутри строки лишь отправляет тело в JSONParser.
+LONG_NUMBER = re.compile(rb'\d{19,}')
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser, разбирающий тело запроса через orjson."""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        # orjson, как и строгий режим DRF, отвергает NaN и Infinity
+        if orjson is None or not self.strict or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        data = stream.read()
+        if LONG_NUMBER.search(data) is None:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(data), media_type, parser_context)
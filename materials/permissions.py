@@ -1,24 +1,93 @@
+from django.db.models import Q
 from rest_framework import status
-from rest_framework.permissions import BasePermission
-
-from users.models import User
+from rest_framework.permissions import AND, NOT, OR, BasePermission
+
+from users.models import ROLE_MODERATOR, User
+from users.serializers import ROLES_CLAIM
+
+
+def get_request_roles(request):
+    """
+    Роли пользователя запроса.
+
+    При JWT роли берутся из claims токена. Для сессии и force_authenticate
+    они один раз читаются из базы и запоминаются на объекте запроса.
+    """
+    roles = getattr(request, '_user_roles', None)
+    if roles is not None:
+        return roles
+    token = getattr(request, 'auth', None)
+    if token is not None and hasattr(token, 'get') and ROLES_CLAIM in token:
+        roles = frozenset(token.get(ROLES_CLAIM))
+    elif request.user.is_authenticated:
+        roles = frozenset(request.user.get_roles())
+    else:
+        roles = frozenset()
+    request._user_roles = roles
+    return roles
+
+
+# Фильтр, не пропускающий ни одного объекта
+NOTHING = Q(pk__in=[])
+
+
+def get_queryset_filter(permission, request, view):
+    """
+    Фильтр Q(), которым право сужает выборку, или None без ограничений.
+
+    Право задаёт фильтр методом get_queryset_filter(request, view).
+    Составные права DRF (&, |, ~) объединяют фильтры своих частей,
+    права без метода выборку не ограничивают.
+    """
+    if isinstance(permission, (AND, OR)):
+        left = get_queryset_filter(permission.op1, request, view)
+        right = get_queryset_filter(permission.op2, request, view)
+        if isinstance(permission, AND):
+            if left is None or right is None:
+                return right if left is None else left
+            return left & right
+        if left is None or right is None:
+            return None
+        return left | right
+    if isinstance(permission, NOT):
+        inner = get_queryset_filter(permission.op1, request, view)
+        return NOTHING if inner is None else ~inner
+    method = getattr(permission, 'get_queryset_filter', None)
+    return method(request, view) if method is not None else None
+
+
+def get_permissions_filter(permissions, request, view):
+    """Общий фильтр списка прав представления: все права должны выполняться."""
+    result = None
+    for permission in permissions:
+        condition = get_queryset_filter(permission, request, view)
+        if condition is not None:
+            result = condition if result is None else result & condition
+    return result
 
 
 class IsModerator(BasePermission):
     """Проверка на модератора."""
 
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='moderators').exists()
+        return ROLE_MODERATOR in get_request_roles(request)
 
     def has_object_permission(self, request, view, obj):
         return self.has_permission(request, view)
 
+    def get_queryset_filter(self, request, view):
+        return None if self.has_permission(request, view) else NOTHING
+
 
 class IsOwner(BasePermission):
     """Проверка на владельца объекта."""
 
     def has_object_permission(self, request, view, obj):
-        return obj.owner == request.user
+        # Сравнение по owner_id не загружает владельца
+        return obj.owner_id is not None and obj.owner_id == request.user.id
+
+    def get_queryset_filter(self, request, view):
+        return Q(owner_id=request.user.id)
 
 
 class NotModerator(BasePermission):
@@ -30,6 +99,9 @@ class NotModerator(BasePermission):
     def has_object_permission(self, request, view, obj):
         return self.has_permission(request, view)
 
+    def get_queryset_filter(self, request, view):
+        return None if self.has_permission(request, view) else NOTHING
+
 
 class ModeratorOrOwner(BasePermission):
     """Проверка, что пользователь является модератором или владельцем."""
@@ -43,6 +115,11 @@ class ModeratorOrOwner(BasePermission):
             IsOwner().has_object_permission(request, view, obj)
         )
 
+    def get_queryset_filter(self, request, view):
+        if IsModerator().has_permission(request, view):
+            return None
+        return IsOwner().get_queryset_filter(request, view)
+
 def test_lesson_access_by_nonowner(self):
     # Создаем второго пользователя
     other_user = User.objects.create_user(
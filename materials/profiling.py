@@ -0,0 +1,138 @@
+"""
+Профилирование запросов: SQL, сериализация, рендер JSON и вызовы Stripe.
+
+ProfilingMiddleware собирает профиль для доли запросов PROFILING_SAMPLE_RATE
+и для запросов с заголовком X-Profile: 1. Сотрудникам профиль возвращается
+в заголовке Server-Timing, медленные запросы из выборки пишутся в лог
+materials.profiling вместе с самыми долгими SQL-запросами. Если профиль не
+собирается, стоимость сводится к одной проверке на запрос и одному чтению
+ContextVar в каждом замеряемом участке.
+"""
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+_current_profile = ContextVar('request_profile', default=None)
+
+
+def get_current_profile():
+    """Профиль текущего запроса или None, если он не собирается."""
+    return _current_profile.get()
+
+
+@contextmanager
+def profile_section(name):
+    """Добавляет время блока к участку name профиля; работает и как декоратор."""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    with profile.section(name):
+        yield
+
+
+class RequestProfile:
+    """Счётчики одного запроса."""
+
+    def __init__(self, capture_queries=False):
+        self.started = time.perf_counter()
+        self.duration = None
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.sections = {}
+        # Тексты запросов нужны только для лога медленных запросов
+        self.queries = [] if capture_queries else None
+        self._open_sections = set()
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sql_count += 1
+            self.sql_time += elapsed
+            if self.queries is not None:
+                self.queries.append((elapsed, sql))
+
+    @contextmanager
+    def section(self, name):
+        # Вложенные участки с тем же именем (вложенные сериализаторы) не считаются дважды
+        if name in self._open_sections:
+            yield
+            return
+        self._open_sections.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections[name] = self.sections.get(name, 0.0) + time.perf_counter() - started
+            self._open_sections.discard(name)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Значение заголовка Server-Timing, длительности в миллисекундах."""
+        metrics = [f'db;dur={self.sql_time * 1000:.1f};desc="SQL: {self.sql_count}"']
+        metrics.extend(f'{name};dur={elapsed * 1000:.1f}' for name, elapsed in self.sections.items())
+        metrics.append(f'total;dur={self.duration * 1000:.1f}')
+        return ', '.join(metrics)
+
+    def top_queries(self, limit):
+        return sorted(self.queries or (), key=lambda query: query[0], reverse=True)[:limit]
+
+
+class ProfilingMiddleware:
+    """Собирает RequestProfile для выборки запросов и запросов с X-Profile: 1."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.slow_request_ms = settings.PROFILING_SLOW_REQUEST_MS
+        self.top_queries = settings.PROFILING_TOP_QUERIES
+
+    def __call__(self, request):
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        requested = request.META.get(PROFILE_HEADER) == '1'
+        if not (sampled or requested):
+            return self.get_response(request)
+
+        profile = RequestProfile(capture_queries=sampled)
+        token = _current_profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        profile.finish()
+
+        # DRF записывает пользователя из JWT и в исходный запрос
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            response['Server-Timing'] = profile.server_timing()
+        if sampled and profile.duration * 1000 >= self.slow_request_ms:
+            self.log_slow_request(request, response, profile)
+        return response
+
+    def log_slow_request(self, request, response, profile):
+        queries = '\n'.join(f'  {elapsed * 1000:.1f} мс: {sql}'
+                            for elapsed, sql in profile.top_queries(self.top_queries))
+        logger.warning(
+            'Медленный запрос %s %s (%s): %.1f мс, SQL: %d за %.1f мс, %s\n%s',
+            request.method, request.get_full_path(), response.status_code, profile.duration * 1000,
+            profile.sql_count, profile.sql_time * 1000,
+            ', '.join(f'{name} {elapsed * 1000:.1f} мс' for name, elapsed in profile.sections.items()),
+            queries,
+        )
@@ -0,0 +1,53 @@
+"""
+Рендерер JSON на orjson.
+
+Ответ совпадает с JSONRenderer DRF байт в байт: Decimal, даты и прочие
+типы, которые orjson не кодирует сам или кодирует иначе, передаются
+кодировщику DRF. Если orjson не установлен, отступ запрошен явно или
+настройки требуют ASCII, используется стандартный рендерер.
+
+Глобально включается в REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'],
+для отдельного представления — атрибутом renderer_classes.
+"""
+from rest_framework.renderers import JSONRenderer
+
+from .profiling import profile_section
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer, кодирующий ответ через orjson."""
+
+    def get_orjson_options(self):
+        # Даты кодируются как в DRF: с миллисекундами и суффиксом Z
+        return orjson.OPT_PASSTHROUGH_DATETIME
+
+    def can_render_fast(self, indent):
+        return orjson is not None and indent is None and self.compact and not self.ensure_ascii
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with profile_section('render'):
+            return self.render_json(data, accepted_media_type, renderer_context)
+
+    def render_json(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if not self.can_render_fast(indent):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.get_orjson_options())
+        except (orjson.JSONEncodeError, ValueError):
+            # Например, целые длиннее 64 бит
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Как и DRF, экранируем U+2028 и U+2029 для совместимости с JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
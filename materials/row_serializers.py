@@ -0,0 +1,180 @@
+"""
+Быстрая сериализация списков только для чтения.
+
+Строки берутся из QuerySet.values(), а не из экземпляров моделей, и
+преобразуются в словари по карте полей, которая один раз строится по
+ModelSerializer. Формат ответа совпадает с CourseSerializer и
+LessonSerializer: порядок полей, ссылки на файлы и даты те же.
+Сериализаторы DRF по-прежнему используются для записи и валидации.
+"""
+from functools import lru_cache
+
+from rest_framework import serializers
+
+from .models import Lesson
+from .profiling import profile_section
+from .serializers import CourseSerializer, LessonSerializer
+
+# Поля, которым значение из базы подходит без преобразования
+PLAIN_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+
+
+@lru_cache(maxsize=None)
+def get_field_names(serializer_class):
+    """Все поля сериализатора: ключ кэша карт строится только из них."""
+    return frozenset(serializer_class(context={}).fields)
+
+
+# Наборы полей приходят из ?fields=, поэтому кэш карт ограничен
+@lru_cache(maxsize=256)
+def get_field_map(serializer_class, fields=None):
+    """
+    Карта полей сериализатора: (имя, столбец values(), вид, поле DRF).
+
+    Вид 'pk' — внешний ключ, 'file' — файл, 'plain' — значение как есть,
+    'convert' — to_representation поля DRF, 'custom' — метод get_<имя>
+    построчного сериализатора.
+    """
+    context = {'fields': set(fields)} if fields is not None else {}
+    serializer = serializer_class(context=context)
+    concrete = {field.name: field for field in serializer_class.Meta.model._meta.concrete_fields}
+
+    field_map = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        model_field = concrete.get(field.source)
+        if model_field is None:
+            field_map.append((name, None, 'custom', field))
+        elif isinstance(field, serializers.RelatedField):
+            field_map.append((name, model_field.attname, 'pk', field))
+        elif isinstance(field, serializers.FileField):
+            field_map.append((name, model_field.attname, 'file', model_field))
+        elif isinstance(field, PLAIN_FIELDS):
+            field_map.append((name, model_field.attname, 'plain', field))
+        else:
+            field_map.append((name, model_field.attname, 'convert', field))
+    return tuple(field_map)
+
+
+class RowSerializer:
+    """
+    Сериализует строки values() по карте полей ModelSerializer.
+
+    Поля без столбца модели (SerializerMethodField, вложенные) заполняются
+    методами get_<имя>(row), столбцы для них перечисляются в custom_columns.
+    """
+    serializer_class = None
+    custom_columns = {}
+
+    def __init__(self, fields=None, request=None):
+        self.request = request
+        if fields is not None:
+            # Неизвестные имена из запроса не порождают новых записей кэша
+            fields = frozenset(fields) & get_field_names(self.serializer_class)
+        self.field_map = get_field_map(self.serializer_class, fields)
+        self.converters = [
+            (name, column, self.get_converter(kind, field, name))
+            for name, column, kind, field in self.field_map
+        ]
+
+    @property
+    def columns(self):
+        """Столбцы для QuerySet.values()."""
+        columns = {self.serializer_class.Meta.model._meta.pk.attname}
+        for name, column, kind, field in self.field_map:
+            if kind == 'custom':
+                columns.update(self.custom_columns.get(name, ()))
+            else:
+                columns.add(column)
+        return columns
+
+    def get_converter(self, kind, field, name):
+        if kind in ('pk', 'plain'):
+            return None
+        if kind == 'custom':
+            return getattr(self, f'get_{name}')
+        if kind == 'file':
+            return self.get_file_converter(field.storage)
+        return field.to_representation
+
+    def get_file_converter(self, storage):
+        request = self.request
+
+        def convert(name):
+            if not name:
+                return None
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+
+        return convert
+
+    def prepare(self, rows):
+        """Загружает данные, общие для всех строк страницы."""
+
+    def to_representation(self, row):
+        data = {}
+        for name, column, convert in self.converters:
+            if column is None:
+                data[name] = convert(row)
+                continue
+            value = row[column]
+            data[name] = value if value is None or convert is None else convert(value)
+        return data
+
+    def serialize(self, rows):
+        rows = list(rows)
+        self.prepare(rows)
+        with profile_section('serialize'):
+            return [self.to_representation(row) for row in rows]
+
+
+class LessonRowSerializer(RowSerializer):
+    """Уроки в формате LessonSerializer."""
+    serializer_class = LessonSerializer
+
+
+class CourseRowSerializer(RowSerializer):
+    """
+    Курсы в формате CourseSerializer.
+
+    Вложенные уроки страницы загружаются одним запросом. Для is_subscribed
+    строки должны содержать аннотацию CourseQuerySet.with_is_subscribed.
+    """
+    serializer_class = CourseSerializer
+    custom_columns = {
+        'lessons_count': ('lessons_count',),
+        'lessons': (),
+        'is_subscribed': ('is_subscribed',),
+        'is_owner': ('owner_id',),
+    }
+
+    def __init__(self, fields=None, request=None):
+        super().__init__(fields, request)
+        self.lessons = {}
+
+    def prepare(self, rows):
+        if not any(name == 'lessons' for name, column, kind, field in self.field_map):
+            return
+        lesson_serializer = LessonRowSerializer(request=self.request)
+        lessons = (
+            Lesson.objects.filter(course_id__in=[row['id'] for row in rows])
+            .order_by('id').values(*lesson_serializer.columns)
+        )
+        self.lessons = {}
+        for lesson in lessons:
+            self.lessons.setdefault(lesson['course_id'], []).append(lesson_serializer.to_representation(lesson))
+
+    # noinspection PyMethodMayBeStatic
+    def get_lessons_count(self, row):
+        return row['lessons_count']
+
+    def get_lessons(self, row):
+        return self.lessons.get(row['id'], [])
+
+    # noinspection PyMethodMayBeStatic
+    def get_is_subscribed(self, row):
+        return row['is_subscribed']
+
+    def get_is_owner(self, row):
+        return row['owner_id'] is not None and row['owner_id'] == self.request.user.id
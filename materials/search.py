@@ -0,0 +1,90 @@
+"""
+Полнотекстовый поиск по курсам и урокам.
+
+Столбцы search_vector заполняются триггером materials_search_vector_update
+(миграция 0009) и покрыты GIN-индексами. Ранжирование выполняется по всем
+совпадениям, а фрагменты с подсветкой строятся только для текущей страницы.
+Названия и описания пишут пользователи, поэтому фрагменты отдаются как
+экранированный HTML, в котором разметкой являются только теги <mark>.
+"""
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F, Value
+from django.utils.html import escape
+
+from .models import Course, Lesson
+
+# Должна совпадать с конфигурацией в триггере materials_search_vector_update
+SEARCH_CONFIG = 'russian'
+
+# ts_headline отмечает совпадения управляющими символами, которые заменяются
+# на <mark> уже после экранирования текста
+START_SEL = '\x02'
+STOP_SEL = '\x03'
+
+HIGHLIGHT_OPTIONS = {
+    'start_sel': START_SEL,
+    'stop_sel': STOP_SEL,
+}
+
+
+def render_highlight(text):
+    """Экранирует фрагмент и расставляет теги <mark> на места отметок."""
+    if text is None:
+        return None
+    return escape(text).replace(START_SEL, '<mark>').replace(STOP_SEL, '</mark>')
+
+
+def make_search_query(text):
+    """Поисковый запрос в синтаксисе веб-поиска: слова, "фразы", -исключения, or."""
+    return SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def _matches(model, kind, course_ref, query):
+    return (
+        model.objects.filter(search_vector=query)
+        .annotate(kind=Value(kind), course_ref=F(course_ref), rank=SearchRank(F('search_vector'), query))
+        .values('kind', 'id', 'course_ref', 'rank')
+    )
+
+
+def search_catalog(query):
+    """Совпадения курсов и уроков, отсортированные по релевантности."""
+    courses = _matches(Course, 'course', 'id', query)
+    lessons = _matches(Lesson, 'lesson', 'course_id', query)
+    return courses.union(lessons, all=True).order_by('-rank', 'kind', 'id')
+
+
+def build_results(rows, query):
+    """Дополняет строки страницы названиями и фрагментами с подсветкой."""
+    headlines = {}
+    for model, kind in ((Course, 'course'), (Lesson, 'lesson')):
+        ids = [row['id'] for row in rows if row['kind'] == kind]
+        if not ids:
+            continue
+        items = model.objects.filter(id__in=ids).annotate(
+            title_highlight=SearchHeadline(
+                'title', query, config=SEARCH_CONFIG, highlight_all=True, **HIGHLIGHT_OPTIONS
+            ),
+            snippet=SearchHeadline(
+                'description', query, config=SEARCH_CONFIG, max_fragments=2, **HIGHLIGHT_OPTIONS
+            ),
+        ).values('id', 'title', 'title_highlight', 'snippet')
+        for item in items:
+            headlines[kind, item['id']] = item
+
+    results = []
+    for row in rows:
+        headline = headlines.get((row['kind'], row['id']))
+        if headline is None:
+            # Объект удалён между запросами
+            continue
+        results.append({
+            'type': row['kind'],
+            'id': row['id'],
+            'course_id': row['course_ref'],
+            'title': headline['title'],
+            'title_highlight': render_highlight(headline['title_highlight']),
+            'snippet': render_highlight(headline['snippet']),
+            'rank': row['rank'],
+        })
+    return results
@@ -1,19 +1,97 @@
 from rest_framework import serializers, status
+from rest_framework.permissions import SAFE_METHODS
+
 from .models import Course, Lesson, CourseSubscription
+from .profiling import get_current_profile
 from .validators import validate_youtube_url
 
 
-class LessonSerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """
+    Выбор полей через параметры запроса ?fields=id,title и ?expand=lessons.
+
+    ?expand добавляет вложенные поля к выборке из ?fields. Без ?fields
+    сериализатор отдаёт все поля. Набор полей можно передать и явно через
+    context['fields']. Поля, которым нужен другой столбец модели,
+    перечисляются в Meta.source_columns.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'fields' in self.context:
+            requested = self.context['fields']
+        else:
+            requested = self.get_requested_fields(self.context.get('request'))
+        if requested is not None:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+    def to_representation(self, instance):
+        profile = get_current_profile()
+        if profile is None:
+            return super().to_representation(instance)
+        with profile.section('serialize'):
+            return super().to_representation(instance)
+
+    @staticmethod
+    def _parse_param(request, name):
+        params = getattr(request, 'query_params', request.GET)
+        value = params.get(name, '')
+        return {item.strip() for item in value.split(',') if item.strip()}
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        """Возвращает множество запрошенных полей или None, если выбор не задан."""
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        fields = cls._parse_param(request, 'fields')
+        if not fields:
+            return None
+        return fields | cls._parse_param(request, 'expand')
+
+    @classmethod
+    def restrict_queryset(cls, queryset, fields):
+        """Откладывает загрузку столбцов, не нужных для запрошенных полей."""
+        if fields is None:
+            return queryset
+        opts = cls.Meta.model._meta
+        concrete = {field.name for field in opts.concrete_fields}
+        source_columns = getattr(cls.Meta, 'source_columns', {})
+        columns = {opts.pk.name} | (fields & concrete)
+        columns |= {source_columns[name] for name in fields if name in source_columns}
+        return queryset.only(*columns)
+
+
+class LessonSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Lesson
-        fields = '__all__'
+        exclude = ['search_vector']
 
     # noinspection PyMethodMayBeStatic
     def validate_video_url(self, value):
         return validate_youtube_url(value)
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class LessonBulkCreateSerializer(LessonSerializer):
+    """
+    Урок для пакетного создания.
+
+    Курс ищется в словаре context['courses'], загруженном одним запросом
+    для всего пакета, а не отдельным запросом на каждый урок.
+    """
+    course = serializers.IntegerField()
+
+    class Meta(LessonSerializer.Meta):
+        read_only_fields = ['owner']
+
+    def validate_course(self, value):
+        course = self.context['courses'].get(value)
+        if course is None:
+            raise serializers.ValidationError(f'Курс с ID {value} не найден')
+        return course
+
+
+class CourseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     lessons_count = serializers.SerializerMethodField()
     lessons = LessonSerializer(many=True, read_only=True)
     is_owner = serializers.SerializerMethodField()
@@ -22,10 +100,15 @@ class CourseSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Course
-        fields = ['id', 'title', 'preview', 'description', 'lessons_count', 'lessons', 'rating', 'is_subscribed', 'is_owner']
-        read_only_fields = ['owner']
+        fields = ['id', 'title', 'preview', 'description', 'price', 'lessons_count', 'lessons', 'rating',
+                  'subscribers_count', 'is_subscribed', 'is_owner']
+        read_only_fields = ['owner', 'price', 'subscribers_count']
+        source_columns = {'is_owner': 'owner'}
 
     def get_is_subscribed(self, obj):
+        # Значение из аннотации CourseQuerySet.with_is_subscribed
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         request = self.context.get('request')
         if request and hasattr(request, 'user') and request.user.is_authenticated:
             return obj.subscriptions.filter(user=request.user).exists()
@@ -33,10 +116,47 @@ class CourseSerializer(serializers.ModelSerializer):
 
     # noinspection PyMethodMayBeStatic
     def get_lessons_count(self, obj):
-        return obj.lessons.count()
+        # Счётчик хранится в курсе и обновляется сигналами
+        return obj.lessons_count
 
     def get_is_owner(self, obj):
-        return obj.owner == self.context['request'].user
+        # Сравниваем по owner_id, чтобы не загружать владельца
+        return obj.owner_id is not None and obj.owner_id == self.context['request'].user.id
+
+
+class CourseSummarySerializer(serializers.ModelSerializer):
+    """Краткие сведения о курсе для списка подписок."""
+
+    class Meta:
+        model = Course
+        fields = ['id', 'title', 'preview', 'price', 'rating', 'lessons_count']
+
+
+class SubscriptionSerializer(serializers.ModelSerializer):
+    course = CourseSummarySerializer(read_only=True)
+
+    class Meta:
+        model = CourseSubscription
+        fields = ['id', 'course', 'created_at']
+
+    @classmethod
+    def restrict_queryset(cls, queryset):
+        """Подписки с курсом одним запросом, без search_vector курса."""
+        course_fields = [f'course__{name}' for name in CourseSummarySerializer.Meta.fields]
+        return queryset.select_related('course').only('id', 'created_at', 'course_id', *course_fields)
+
+
+class CourseIdsSerializer(serializers.Serializer):
+    """Список ID курсов для пакетной подписки и отписки."""
+    max_batch_size = 1000
+
+    course_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=max_batch_size
+    )
+
+    # noinspection PyMethodMayBeStatic
+    def validate_course_ids(self, value):
+        return sorted(set(value))
 
 
 def test_course_serializer_data(self):
@@ -1,9 +1,12 @@
 import stripe
 from django.conf import settings
 
+from .profiling import profile_section
+
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
+@profile_section('stripe')
 def create_stripe_product(course):
     """Создание продукта в Stripe"""
     product = stripe.Product.create(
@@ -13,6 +16,7 @@ def create_stripe_product(course):
     return product
 
 
+@profile_section('stripe')
 def create_stripe_price(product_id, amount):
     """Создание цены в Stripe"""
     price = stripe.Price.create(
@@ -23,6 +27,7 @@ def create_stripe_price(product_id, amount):
     return price
 
 
+@profile_section('stripe')
 def create_stripe_session(price_id, success_url, cancel_url):
     """Создание сессии для оплаты"""
     session = stripe.checkout.Session.create(
@@ -40,12 +45,14 @@ def create_stripe_session(price_id, success_url, cancel_url):
     return session
 
 
+@profile_section('stripe')
 def get_session_status(session_id):
     """Получение статуса сессии"""
     session = stripe.checkout.Session.retrieve(session_id)
     return session.payment_status
 
 
+@profile_section('stripe')
 def retrieve_stripe_session(session_id):
     """
     Получение полной информации о сессии оплаты
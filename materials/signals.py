@@ -0,0 +1,111 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version, touch_catalog_deleted
+from .models import Course, CourseSubscription, Lesson
+
+
+def _is_bulk_delete(instance, origin):
+    """Запись удаляется каскадом от другого объекта или через QuerySet.delete()."""
+    return origin is not None and origin is not instance
+
+
+def _deletes_courses(origin):
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, Course)
+
+
+def _defer_recount(origin, course_id=None):
+    """
+    Копит курсы, затронутые одним удалением, и пересчитывает их после коммита.
+
+    Вместо UPDATE на каждую удалённую запись — один пересчёт счётчиков и одно
+    изменение версии кэша каталога на всё удаление.
+    """
+    course_ids = getattr(origin, '_recount_course_ids', None)
+    if course_ids is None:
+        course_ids = origin._recount_course_ids = set()
+        transaction.on_commit(lambda: _recount(course_ids))
+    if course_id is not None:
+        course_ids.add(course_id)
+
+
+def _recount(course_ids):
+    if course_ids:
+        Course.objects.filter(pk__in=course_ids).recount_counters()
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def invalidate_catalog_cache(sender, instance, origin=None, **kwargs):
+    """Сбрасывает кэш каталога при изменении курсов и уроков."""
+    if _is_bulk_delete(instance, origin):
+        _defer_recount(origin)
+    else:
+        bump_catalog_version()
+
+
+@receiver(post_delete, sender=Course)
+def course_deleted(sender, instance, origin=None, **kwargs):
+    """Запоминает время удаления для Last-Modified списка: после коммита, один раз на удаление."""
+    origin = instance if origin is None else origin
+    if not getattr(origin, '_catalog_deleted_touched', False):
+        origin._catalog_deleted_touched = True
+        transaction.on_commit(touch_catalog_deleted)
+
+
+def _shift_cached_course(instance, counters):
+    # Держим согласованным уже загруженный в память курс
+    if type(instance).course.is_cached(instance):
+        for name, delta in counters.items():
+            setattr(instance.course, name, max(getattr(instance.course, name) + delta, 0))
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_saved(sender, instance, created, **kwargs):
+    """Курс, в ответ которого входят уроки, считается изменённым."""
+    loaded_course_id = getattr(instance, '_loaded_course_id', None)
+    if created:
+        counters = {'lessons_count': 1}
+    elif loaded_course_id is not None and loaded_course_id != instance.course_id:
+        # Урок перенесён в другой курс: старый курс теряет урок
+        Course.objects.filter(pk=loaded_course_id).shift_counters(lessons_count=-1)
+        counters = {'lessons_count': 1}
+    else:
+        counters = {}
+    Course.objects.filter(pk=instance.course_id).shift_counters(**counters)
+    _shift_cached_course(instance, counters)
+    instance._loaded_course_id = instance.course_id
+
+
+@receiver(post_delete, sender=Lesson)
+def lesson_deleted(sender, instance, origin=None, **kwargs):
+    if _is_bulk_delete(instance, origin):
+        # Вместе с курсом счётчики не нужны, иначе — один пересчёт на удаление
+        if not _deletes_courses(origin):
+            _defer_recount(origin, instance.course_id)
+        return
+    Course.objects.filter(pk=instance.course_id).shift_counters(lessons_count=-1)
+    _shift_cached_course(instance, {'lessons_count': -1})
+
+
+@receiver(post_save, sender=CourseSubscription)
+def subscription_saved(sender, instance, created, **kwargs):
+    if created:
+        Course.objects.filter(pk=instance.course_id).shift_counters(subscribers_count=1)
+        _shift_cached_course(instance, {'subscribers_count': 1})
+
+
+@receiver(post_delete, sender=CourseSubscription)
+def subscription_deleted(sender, instance, origin=None, **kwargs):
+    if _is_bulk_delete(instance, origin):
+        if not _deletes_courses(origin):
+            _defer_recount(origin, instance.course_id)
+        return
+    Course.objects.filter(pk=instance.course_id).shift_counters(subscribers_count=-1)
+    _shift_cached_course(instance, {'subscribers_count': -1})
@@ -1,4 +1,17 @@
-from celery import shared_task
+from datetime import datetime, timedelta
+from itertools import islice
+from smtplib import SMTPException
+
+import redis
+from celery import chord, shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Window
+from django.db.models.functions import Mod, RowNumber
+from django.utils import timezone
+
+from users.cache import deny_users
 
 
 @shared_task
@@ -8,41 +21,130 @@ def example_task():
     return "Task completed successfully"
 
 
-from celery import shared_task
-from django.core.mail import send_mail
-from django.conf import settings
-from datetime import datetime
+def iter_chunks(iterable, size):
+    """Делит итератор на списки по size элементов."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
 
 
-@shared_task
-def send_course_update_notification(course_id, course_title):
-    """Отправляет уведомление подписчикам о обновлении курса."""
+def build_course_update_message(course_title, email, first_name, connection, changes=None):
+    subject = f'Обновление в курсе "{course_title}"'
+    greeting = f'Здравствуйте, {first_name}!' if first_name else 'Здравствуйте!'
+    message = f'{greeting}\n\nВ курсе "{course_title}", на который вы подписаны, появилось обновление.'
+    if changes:
+        message += '\n\nИзменения:\n' + '\n'.join(f'- {line}' for line in changes)
+    message += '\n\nС уважением,\nКоманда LMS'
+    return EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [email], connection=connection)
+
+
+def get_chunk_bounds(course_id, chunk_size):
+    """
+    Делит подписчиков курса на диапазоны user_id по chunk_size подписчиков.
+
+    Каждый chunk_size-й user_id выбирается одним запросом по индексу
+    (course, user). Возвращает пары [первый user_id, первый user_id
+    следующего диапазона); у последнего диапазона верхней границы нет.
+    """
     from .models import CourseSubscription
 
-    # Получаем всех подписчиков курса
-    subscriptions = CourseSubscription.objects.filter(course_id=course_id)
+    starts = list(
+        CourseSubscription.objects.filter(course_id=course_id)
+        .annotate(row=Window(RowNumber(), order_by=F('user_id').asc()))
+        .annotate(offset=Mod(F('row') - 1, chunk_size))
+        .filter(offset=0)
+        .order_by('user_id')
+        .values_list('user_id', flat=True)
+    )
+    return list(zip(starts, starts[1:] + [None]))
 
-    for subscription in subscriptions:
-        user = subscription.user
 
-        subject = f'Обновление в курсе "{course_title}"'
-        message = f'Здравствуйте, {user.username}!\n\nВ курсе "{course_title}", на который вы подписаны, появилось обновление.\n\nС уважением,\nКоманда LMS'
+@shared_task(autoretry_for=(redis.RedisError,), retry_backoff=True, retry_kwargs={'max_retries': 5})
+def flush_course_changes(course_id):
+    """
+    Рассылает одно уведомление со сводкой изменений курса за окно.
 
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
+    Планируется на конец окна первым изменением, см. materials.notifications.
+    """
+    from .models import Course
+    from .notifications import build_digest, pop_course_changes
 
-    return f"Отправлены уведомления {subscriptions.count()} подписчикам курса {course_title}"
+    changes = pop_course_changes(course_id)
+    course_title = Course.objects.filter(pk=course_id).values_list('title', flat=True).first()
+    if not changes or course_title is None:
+        return f"Нет изменений курса {course_id} для рассылки"
+    return send_course_update_notification(course_id, course_title, build_digest(changes))
 
 
-from celery import shared_task
-from django.contrib.auth import get_user_model
-from django.utils import timezone
-from datetime import timedelta
+@shared_task
+def send_course_update_notification(course_id, course_title, changes=None):
+    """
+    Отправляет уведомление подписчикам о обновлении курса.
+
+    Подписчики делятся на диапазоны по NOTIFICATION_TASK_CHUNK_SIZE, каждый
+    диапазон рассылается отдельной задачей группы, итог собирает chord.
+    changes — строки сводки изменений для текста письма.
+    """
+    bounds = get_chunk_bounds(course_id, settings.NOTIFICATION_TASK_CHUNK_SIZE)
+    if not bounds:
+        return f"У курса {course_title} нет подписчиков"
+
+    chord(
+        send_course_update_chunk.s(course_id, course_title, first_user_id=first_user_id,
+                                   next_user_id=next_user_id, changes=changes)
+        for first_user_id, next_user_id in bounds
+    )(summarize_course_update_notification.s(course_title))
+    return f"Рассылка по курсу {course_title} запущена, частей: {len(bounds)}"
+
+
+@shared_task(bind=True, max_retries=5)
+def send_course_update_chunk(self, course_id, course_title, first_user_id=None, next_user_id=None, changes=None,
+                             already_sent=0):
+    """
+    Отправляет уведомление подписчикам курса с user_id из [first_user_id, next_user_id).
+
+    Адреса читаются потоком без загрузки пользователей, письма уходят
+    пачками по NOTIFICATION_CHUNK_SIZE через одно SMTP-соединение. При
+    ошибке SMTP задача повторяется с пачки, на которой случилась ошибка:
+    уже отправленные пачки не отправляются повторно. already_sent —
+    число писем, отправленных до повтора.
+    """
+    from .models import CourseSubscription
+
+    subscriptions = CourseSubscription.objects.filter(course_id=course_id)
+    if first_user_id is not None:
+        subscriptions = subscriptions.filter(user_id__gte=first_user_id)
+    if next_user_id is not None:
+        subscriptions = subscriptions.filter(user_id__lt=next_user_id)
+
+    chunk_size = settings.NOTIFICATION_CHUNK_SIZE
+    subscribers = (
+        subscriptions.order_by('user_id')
+        .values_list('user_id', 'user__email', 'user__first_name')
+        .iterator(chunk_size=chunk_size)
+    )
+
+    sent = already_sent
+    resume_from = first_user_id
+    try:
+        with get_connection(fail_silently=False) as connection:
+            for chunk in iter_chunks(subscribers, chunk_size):
+                resume_from = chunk[0][0]
+                messages = [build_course_update_message(course_title, email, first_name, connection, changes)
+                            for user_id, email, first_name in chunk]
+                sent += connection.send_messages(messages) or 0
+    except (SMTPException, OSError) as e:
+        raise self.retry(exc=e, countdown=2 ** self.request.retries, args=(course_id, course_title), kwargs={
+            'first_user_id': resume_from, 'next_user_id': next_user_id, 'changes': changes, 'already_sent': sent,
+        })
+
+    return sent
+
+
+@shared_task
+def summarize_course_update_notification(results, course_title):
+    """Собирает итог рассылки по результатам задач-диапазонов."""
+    return f"Отправлены уведомления {sum(results)} подписчикам курса {course_title}"
 
 
 @shared_task
@@ -66,8 +168,10 @@ def deactivate_inactive_users():
         date_joined__lt=month_ago
     )
 
-    # Деактивируем найденных пользователей
-    count = inactive_users.count()
-    inactive_users.update(is_active=False)
+    # Деактивируем найденных пользователей; update() не отправляет сигналы,
+    # поэтому их токены отклоняются через список запрета
+    user_ids = list(inactive_users.values_list('id', flat=True))
+    count = User.objects.filter(pk__in=user_ids, is_active=True).update(is_active=False)
+    deny_users(user_ids)
 
     return f"Деактивировано {count} неактивных пользователей"
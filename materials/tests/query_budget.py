@@ -0,0 +1,101 @@
+"""
+Проверка бюджета SQL-запросов для маршрутов API.
+
+Бюджет объявляется в представлении атрибутом query_budget — словарём
+{HTTP-метод: максимальное число запросов}. Маршрут вызывается дважды:
+после заполнения базы base_rows строками и после доведения их числа до
+base_rows * scale. Число запросов не должно расти вместе с данными
+(признак N+1) и не должно превышать бюджет. Аутентификация в замер не
+входит: клиент использует force_authenticate.
+
+seed(count) по умолчанию добавляет count курсов, и у каждого — count уроков
+и count подписчиков: у курса второго замера зависимых строк в scale раз
+больше, поэтому запрос на каждую строку при каскадном удалении тоже
+меняет счёт.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from materials import urls as materials_urls
+from materials.models import Course, CourseSubscription, Lesson, Payment
+from users import urls as users_urls
+
+User = get_user_model()
+
+BUDGETED_URLCONFS = (materials_urls, users_urls)
+
+VIDEO_URL = 'https://www.youtube.com/watch?v=test'
+
+
+def get_budgeted_routes():
+    """Имена маршрутов и классы представлений из проверяемых urls.py."""
+    return {
+        pattern.name: pattern.callback.view_class
+        for urlconf in BUDGETED_URLCONFS
+        for pattern in urlconf.urlpatterns
+    }
+
+
+class QueryBudgetMixin:
+    """
+    Примесь к APITestCase с assertQueryBudget; seed() заполняет базу.
+
+    Тест задаёт self.user (клиент) и self.other_user: курсы достаются им
+    поочерёдно, self.user подписан на каждый второй и оплатил каждый.
+    """
+    base_rows = 3
+    scale = 10
+    seeded = 0
+
+    def seed(self, count):
+        users = User.objects.bulk_create(
+            User(email=f'user{self.seeded + i}@example.com') for i in range(count)
+        )
+        courses = Course.objects.bulk_create(
+            Course(title=f'Курс {self.seeded + i}', description='Описание курса', price=100,
+                   owner=self.user if i % 2 else self.other_user)
+            for i in range(count)
+        )
+        Lesson.objects.bulk_create(
+            Lesson(title=f'Урок {j}', description='Описание урока', video_url=VIDEO_URL,
+                   course=course, owner=course.owner)
+            for course in courses for j in range(count)
+        )
+        CourseSubscription.objects.bulk_create(
+            [CourseSubscription(user=self.user, course=course) for course in courses[::2]]
+            + [CourseSubscription(user=user, course=course) for course in courses for user in users]
+        )
+        Payment.objects.bulk_create(
+            Payment(user=self.user, course=course, amount=100, session_id=f'cs_{course.id}')
+            for course in courses
+        )
+        self.seeded += count
+
+    def call_route(self, url_name, method, kwargs=None, data=None):
+        # Аргументы вычисляются до замера, чтобы их запросы не попали в счёт
+        kwargs = kwargs() if callable(kwargs) else kwargs
+        data = data() if callable(data) else data
+        url = reverse(url_name, kwargs=kwargs)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method.lower())(url, data, format=None if method == 'GET' else 'json')
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, f'{method} {url}: {response.status_code}')
+        return len(queries), queries
+
+    def assertQueryBudget(self, url_name, method, kwargs=None, data=None):
+        view_class = get_budgeted_routes()[url_name]
+        budget = getattr(view_class, 'query_budget', {}).get(method)
+        self.assertIsNotNone(budget, f'{view_class.__name__}.query_budget не задан для {method}')
+
+        self.seed(self.base_rows)
+        small, _ = self.call_route(url_name, method, kwargs, data)
+        self.seed(self.base_rows * (self.scale - 1))
+        large, queries = self.call_route(url_name, method, kwargs, data)
+
+        sql = '\n'.join(query['sql'] for query in queries)
+        self.assertEqual(small, large, f'{method} {url_name}: число запросов растёт с данными\n{sql}')
+        self.assertLessEqual(large, budget, f'{method} {url_name}: {large} запросов при бюджете {budget}\n{sql}')
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from materials.models import Course, Lesson
+
+User = get_user_model()
+
+
+class LessonBulkCreateTestCase(APITestCase):
+    """Тесты для пакетного создания уроков."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.courses = [
+            Course.objects.create(title=f'Курс {i}', description='Описание', owner=self.user)
+            for i in range(2)
+        ]
+        self.client.force_authenticate(user=self.user)
+
+    def make_items(self, count):
+        return [
+            {
+                'title': f'Урок {i}',
+                'description': 'Описание урока',
+                'course': self.courses[i % 2].id,
+                'video_url': 'https://youtube.com/watch?v=dQw4w9WgXcQ'
+            }
+            for i in range(count)
+        ]
+
+    def test_bulk_create(self):
+        """Уроки создаются, счётчики курсов обновляются."""
+        response = self.client.post('/api/lessons/bulk/', self.make_items(5), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 5)
+        self.assertTrue(all(item['owner'] == self.user.id for item in response.data))
+        self.assertEqual(Lesson.objects.count(), 5)
+        self.assertEqual(
+            sorted(Course.objects.values_list('lessons_count', flat=True)), [2, 3]
+        )
+
+    def test_constant_queries(self):
+        """Число запросов не зависит от размера пакета."""
+        with CaptureQueriesContext(connection) as small:
+            self.client.post('/api/lessons/bulk/', self.make_items(2), format='json')
+        with CaptureQueriesContext(connection) as large:
+            self.client.post('/api/lessons/bulk/', self.make_items(200), format='json')
+
+        self.assertEqual(len(small), len(large))
+
+    def test_errors_per_item(self):
+        """Ошибки возвращаются по каждому уроку, ничего не создаётся."""
+        items = self.make_items(3)
+        items[1]['video_url'] = 'https://vimeo.com/12345'
+        items[2]['course'] = 999999
+
+        response = self.client.post('/api/lessons/bulk/', items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('video_url', response.data[1])
+        self.assertIn('course', response.data[2])
+        self.assertEqual(Lesson.objects.count(), 0)
+
+    def test_not_a_list(self):
+        """Тело запроса должно быть списком."""
+        response = self.client.post('/api/lessons/bulk/', {'title': 'Урок'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
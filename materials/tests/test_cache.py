@@ -0,0 +1,113 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from materials.models import Course, Lesson, CourseSubscription
+
+User = get_user_model()
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CatalogCacheTestCase(APITestCase):
+    """Тесты для кэша каталога курсов."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        cache.clear()
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            password='password'
+        )
+        self.student = User.objects.create_user(
+            email='student@example.com',
+            password='password'
+        )
+        self.course = Course.objects.create(
+            title='Тестовый курс',
+            description='Описание тестового курса',
+            owner=self.owner
+        )
+        self.lesson = Lesson.objects.create(
+            title='Тестовый урок',
+            description='Описание тестового урока',
+            course=self.course,
+            owner=self.owner
+        )
+        CourseSubscription.objects.create(user=self.student, course=self.course)
+
+    def get(self, user, url):
+        self.client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, queries
+
+    def test_course_list_cached(self):
+        """Повторный запрос списка не обращается к таблице курсов."""
+        self.get(self.owner, '/api/courses/')
+        response, queries = self.get(self.owner, '/api/courses/')
+
+        sql = '\n'.join(query['sql'] for query in queries)
+        self.assertNotIn('"materials_course"."title"', sql)
+        self.assertEqual(response.data['results'][0]['title'], 'Тестовый курс')
+
+    def test_popular_ordering_not_cached(self):
+        """Порядок по популярности следует за подписками, которые не меняют версию каталога."""
+        other = Course.objects.create(title='Другой курс', description='Описание', owner=self.owner)
+        url = '/api/courses/?ordering=popular'
+        response, _ = self.get(self.owner, url)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.course.id, other.id])
+
+        CourseSubscription.objects.subscribe_many(self.owner.id, [other.id])
+        CourseSubscription.objects.toggle(self.student.id, other.id)
+
+        response, _ = self.get(self.owner, url)
+        self.assertEqual([item['id'] for item in response.data['results']], [other.id, self.course.id])
+
+    def test_user_fields_not_shared(self):
+        """is_subscribed и is_owner вычисляются для каждого пользователя."""
+        owner_response, _ = self.get(self.owner, f'/api/courses/{self.course.id}/')
+        student_response, _ = self.get(self.student, f'/api/courses/{self.course.id}/')
+
+        self.assertTrue(owner_response.data['is_owner'])
+        self.assertFalse(owner_response.data['is_subscribed'])
+        self.assertFalse(student_response.data['is_owner'])
+        self.assertTrue(student_response.data['is_subscribed'])
+        self.assertEqual(list(owner_response.data), list(student_response.data))
+
+    def test_course_save_invalidates(self):
+        """Сохранение курса сбрасывает кэш."""
+        self.get(self.owner, f'/api/courses/{self.course.id}/')
+        self.course.title = 'Новое название'
+        self.course.save()
+
+        response, _ = self.get(self.owner, f'/api/courses/{self.course.id}/')
+        self.assertEqual(response.data['title'], 'Новое название')
+
+    def test_lesson_changes_invalidate(self):
+        """Изменение и удаление урока сбрасывают кэш курса и урока."""
+        self.get(self.owner, f'/api/courses/{self.course.id}/')
+        self.get(self.owner, f'/api/lessons/{self.lesson.id}/')
+
+        self.lesson.title = 'Новый урок'
+        self.lesson.save()
+        response, _ = self.get(self.owner, f'/api/lessons/{self.lesson.id}/')
+        self.assertEqual(response.data['title'], 'Новый урок')
+
+        self.lesson.delete()
+        response, _ = self.get(self.owner, f'/api/courses/{self.course.id}/')
+        self.assertEqual(response.data['lessons_count'], 0)
+
+    def test_missing_course_not_cached(self):
+        """Несуществующий курс возвращает 404."""
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get('/api/courses/999999/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from materials.models import Course, Lesson, CourseSubscription
+
+User = get_user_model()
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class ConditionalGetTestCase(APITestCase):
+    """Тесты для ETag и Last-Modified."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.course = Course.objects.create(
+            title='Тестовый курс',
+            description='Описание тестового курса',
+            owner=self.user
+        )
+        self.lesson = Lesson.objects.create(
+            title='Тестовый урок',
+            description='Описание тестового урока',
+            course=self.course,
+            owner=self.user
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def revalidate(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+        with CaptureQueriesContext(connection) as queries:
+            repeated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        return response, repeated, queries
+
+    def test_course_detail_not_modified(self):
+        """Повторный запрос с тем же ETag получает 304 одним запросом к БД."""
+        response, repeated, queries = self.revalidate(f'/api/courses/{self.course.id}/')
+
+        self.assertEqual(repeated.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(repeated['ETag'], response['ETag'])
+        self.assertEqual(len(queries), 1)
+
+    def test_lesson_detail_not_modified(self):
+        """304 для урока."""
+        _, repeated, queries = self.revalidate(f'/api/lessons/{self.lesson.id}/')
+
+        self.assertEqual(repeated.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 1)
+
+    def test_course_list_not_modified(self):
+        """304 для списка курсов одним запросом к БД."""
+        _, repeated, queries = self.revalidate('/api/courses/')
+
+        self.assertEqual(repeated.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 1)
+
+    def test_lesson_change_modifies_course(self):
+        """Изменение урока меняет ETag курса."""
+        response = self.client.get(f'/api/courses/{self.course.id}/')
+        self.lesson.title = 'Новый урок'
+        self.lesson.save()
+
+        repeated = self.client.get(f'/api/courses/{self.course.id}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeated.status_code, status.HTTP_200_OK)
+        self.assertEqual(repeated.data['lessons'][0]['title'], 'Новый урок')
+
+    def test_subscription_modifies_etag(self):
+        """Подписка пользователя меняет ETag курса и списка."""
+        detail = self.client.get(f'/api/courses/{self.course.id}/')
+        listing = self.client.get('/api/courses/')
+        CourseSubscription.objects.create(user=self.user, course=self.course)
+
+        detail = self.client.get(f'/api/courses/{self.course.id}/', HTTP_IF_NONE_MATCH=detail['ETag'])
+        listing = self.client.get('/api/courses/', HTTP_IF_NONE_MATCH=listing['ETag'])
+        self.assertEqual(detail.status_code, status.HTTP_200_OK)
+        self.assertTrue(detail.data['is_subscribed'])
+        self.assertEqual(listing.status_code, status.HTTP_200_OK)
+
+    def test_unsubscribe_modifies_list(self):
+        """Отписка меняет ETag списка курсов."""
+        CourseSubscription.objects.create(user=self.user, course=self.course)
+        listing = self.client.get('/api/courses/')
+
+        response = self.client.post('/api/subscription/', {'course_id': self.course.id}, format='json')
+        self.assertEqual(response.data['message'], 'подписка удалена')
+
+        listing = self.client.get('/api/courses/', HTTP_IF_NONE_MATCH=listing['ETag'])
+        self.assertEqual(listing.status_code, status.HTTP_200_OK)
+        self.assertFalse(listing.data['results'][0]['is_subscribed'])
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_course_delete_modifies_list(self):
+        """Удаление самого нового курса сдвигает Last-Modified списка вперёд."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        newest = Course.objects.create(title='Новый курс', description='Описание', owner=self.user)
+        Course.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        response = self.client.get('/api/courses/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            newest.delete()
+
+        repeated = self.client.get('/api/courses/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(repeated.status_code, status.HTTP_200_OK)
+        self.assertEqual(repeated.data['count'], 1)
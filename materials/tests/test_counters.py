@@ -0,0 +1,164 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
+
+from materials.models import Course, Lesson, CourseSubscription
+from materials.paginators import MaterialsPagination
+
+User = get_user_model()
+
+
+class CourseCountersTestCase(APITestCase):
+    """Тесты для счётчиков lessons_count и subscribers_count."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.course = Course.objects.create(
+            title='Тестовый курс',
+            description='Описание тестового курса',
+            owner=self.user
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_lesson_create_and_delete(self):
+        """Создание и удаление урока через API меняют lessons_count."""
+        response = self.client.post('/api/lessons/', {
+            'title': 'Урок',
+            'description': 'Описание',
+            'course': self.course.id,
+            'video_url': 'https://youtube.com/watch?v=dQw4w9WgXcQ'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.lessons_count, 1)
+
+        response = self.client.delete(f'/api/lessons/{response.data["id"]}/delete/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.lessons_count, 0)
+
+    def test_lesson_move(self):
+        """Перенос урока в другой курс сдвигает счётчики и дату изменения обоих курсов."""
+        lesson = Lesson.objects.create(title='Урок', description='Описание', course=self.course, owner=self.user)
+        target = Course.objects.create(title='Другой курс', description='Описание', owner=self.user)
+        self.course.refresh_from_db()
+        updated_at = (self.course.updated_at, target.updated_at)
+
+        response = self.client.patch(f'/api/lessons/{lesson.id}/update/', {'course': target.id}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.course.refresh_from_db()
+        target.refresh_from_db()
+        self.assertEqual((self.course.lessons_count, target.lessons_count), (0, 1))
+        self.assertGreater(self.course.updated_at, updated_at[0])
+        self.assertGreater(target.updated_at, updated_at[1])
+
+    def create_course(self, lessons, subscribers):
+        course = Course.objects.create(title='Курс', description='Описание', owner=self.user)
+        Lesson.objects.bulk_create(
+            Lesson(title=f'Урок {i}', description='Описание', course=course, owner=self.user) for i in range(lessons)
+        )
+        users = User.objects.bulk_create(
+            User(email=f'user{course.id}-{i}@example.com') for i in range(subscribers)
+        )
+        CourseSubscription.objects.bulk_create(CourseSubscription(user=user, course=course) for user in users)
+        return course
+
+    def delete_course(self, course):
+        with CaptureQueriesContext(connection) as captured, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/courses/{course.id}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        return [query['sql'] for query in captured]
+
+    def test_course_delete_constant_queries(self):
+        """Удаление курса не обновляет счётчики по каждому уроку и подписке."""
+        small = self.delete_course(self.create_course(lessons=10, subscribers=10))
+        large = self.delete_course(self.create_course(lessons=90, subscribers=90))
+        self.assertEqual(len(small), len(large))
+
+        # Django удаляет собранные записи пачками по 100 id
+        queries = self.delete_course(self.create_course(lessons=100, subscribers=300))
+        self.assertEqual(len(queries), len(small) + 2)
+        self.assertFalse([sql for sql in queries if sql.startswith('UPDATE')])
+
+    def test_cascade_recount(self):
+        """Каскадное и пакетное удаление пересчитывают счётчики одним UPDATE."""
+        other_course = self.create_course(lessons=3, subscribers=0)
+        subscriber = User.objects.create_user(email='subscriber@example.com', password='password')
+        for course in (self.course, other_course):
+            CourseSubscription.objects.create(user=subscriber, course=course)
+
+        with CaptureQueriesContext(connection) as captured, self.captureOnCommitCallbacks(execute=True):
+            subscriber.delete()
+            Lesson.objects.filter(course=other_course).delete()
+
+        updates = [query['sql'] for query in captured if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.course.refresh_from_db()
+        other_course.refresh_from_db()
+        self.assertEqual((self.course.subscribers_count, other_course.subscribers_count), (0, 0))
+        self.assertEqual(other_course.lessons_count, 0)
+
+    def test_subscription_toggle(self):
+        """Переключение подписки меняет subscribers_count."""
+        self.client.post('/api/subscription/', {'course_id': self.course.id}, format='json')
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.subscribers_count, 1)
+
+        response = self.client.get(f'/api/courses/{self.course.id}/')
+        self.assertEqual(response.data['subscribers_count'], 1)
+
+        self.client.post('/api/subscription/', {'course_id': self.course.id}, format='json')
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.subscribers_count, 0)
+
+    def test_recount_command(self):
+        """Команда пересчёта исправляет расхождения."""
+        Lesson.objects.create(title='Урок', description='Описание', course=self.course)
+        CourseSubscription.objects.create(user=self.user, course=self.course)
+        Course.objects.filter(pk=self.course.pk).update(lessons_count=7, subscribers_count=0)
+
+        out = StringIO()
+        call_command('recount_course_counters', stdout=out)
+
+        self.course.refresh_from_db()
+        self.assertEqual((self.course.lessons_count, self.course.subscribers_count), (1, 1))
+        self.assertIn('1', out.getvalue())
+
+    def test_popular_ordering(self):
+        """?ordering=popular сортирует по числу подписчиков в обоих режимах пагинации."""
+        popular = Course.objects.create(title='Популярный', description='Описание')
+        other = User.objects.create_user(email='other@example.com', password='password')
+        CourseSubscription.objects.create(user=self.user, course=popular)
+        CourseSubscription.objects.create(user=other, course=popular)
+        CourseSubscription.objects.create(user=other, course=self.course)
+        quiet = Course.objects.create(title='Тихий', description='Описание')
+        expected = [popular.id, self.course.id, quiet.id]
+
+        response = self.client.get('/api/courses/', {'ordering': 'popular'})
+        self.assertEqual([item['id'] for item in response.data['results']], expected)
+
+        response = self.client.get('/api/courses/', {'ordering': 'popular', 'pagination': 'cursor'})
+        self.assertEqual([item['id'] for item in response.data['results']], expected)
+
+        # Переход между страницами при убывающем порядке
+        view = type('View', (), {'keyset_ordering': ('-subscribers_count', '-id')})()
+        ids = []
+        url = '/api/courses/?pagination=cursor&page_size=1'
+        while url:
+            paginator = MaterialsPagination()
+            request = Request(APIRequestFactory().get(url))
+            ids.extend(course.id for course in paginator.paginate_queryset(Course.objects.all(), request, view))
+            url = paginator.get_next_link()
+        self.assertEqual(ids, expected)
@@ -0,0 +1,83 @@
+import csv
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from materials.models import Course, Payment
+
+User = get_user_model()
+
+
+class PaymentExportTestCase(APITestCase):
+    """Тесты для потоковой выгрузки платежей."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='buyer@example.com',
+            password='password'
+        )
+        self.other = User.objects.create_user(
+            email='other@example.com',
+            password='password'
+        )
+        self.staff = User.objects.create_user(
+            email='finance@example.com',
+            password='password',
+            is_staff=True
+        )
+        self.course = Course.objects.create(title='Курс', description='Описание', price=100)
+        for i, user in enumerate((self.user, self.user, self.other)):
+            Payment.objects.create(user=user, course=self.course, amount='100.00', session_id=f'cs_test_{i}')
+
+    def stream(self, params, user):
+        self.client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/payment/export/', params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            body = b''.join(response.streaming_content).decode()
+        return response, body, queries
+
+    def test_ndjson_own_payments(self):
+        """Пользователь выгружает только свои платежи одним запросом."""
+        response, body, queries = self.stream({}, self.user)
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['course'], 'Курс')
+        self.assertEqual(rows[0]['amount'], '100.00')
+        self.assertEqual(rows[0]['user_email'], 'buyer@example.com')
+        self.assertEqual(len([q for q in queries if 'materials_payment' in q['sql']]), 1)
+
+    def test_csv_staff(self):
+        """Сотрудник выгружает все платежи или платежи пользователя."""
+        _, body, _ = self.stream({'export_format': 'csv'}, self.staff)
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual(len(rows), 3)
+
+        _, body, _ = self.stream({'export_format': 'csv', 'user_id': self.other.id}, self.staff)
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual([row['user_email'] for row in rows], ['other@example.com'])
+
+    def test_invalid_format(self):
+        """Неизвестный формат возвращает 400."""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/payment/export/', {'export_format': 'xml'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command(self):
+        """Команда export_payments пишет CSV в stdout."""
+        out = StringIO()
+        call_command('export_payments', '--format', 'csv', '--chunk-size', '1', stdout=out)
+
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 3)
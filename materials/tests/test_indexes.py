@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from materials.models import Course, CourseSubscription, Lesson, Payment
+
+User = get_user_model()
+
+
+class IndexUsageTestCase(APITestCase):
+    """Горячие запросы используют предназначенные для них индексы."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.course = Course.objects.create(title='Курс', description='Описание', price=100)
+        CourseSubscription.objects.create(user=self.user, course=self.course)
+        Payment.objects.create(user=self.user, course=self.course, amount='100.00', session_id='cs_test')
+        # На маленьких таблицах планировщик иначе выбирает последовательное чтение
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, *names):
+        plan = queryset.explain()
+        self.assertNotIn('Seq Scan', plan)
+        for name in names:
+            self.assertIn(name, plan)
+
+    def test_user_payments(self):
+        """Платежи пользователя по дате."""
+        queryset = Payment.objects.filter(user=self.user).order_by('-created_at')
+
+        self.assertUsesIndex(queryset, 'payment_user_created_idx')
+
+    def test_payment_by_session(self):
+        """Поиск платежа по ID сессии Stripe."""
+        self.assertUsesIndex(Payment.objects.filter(session_id='cs_test'), 'payment_session_id_uniq')
+
+    def test_course_subscribers(self):
+        """Подписчики курса для уведомлений."""
+        queryset = CourseSubscription.objects.filter(course_id=self.course.id).values_list('user__email')
+
+        self.assertUsesIndex(queryset, 'subscription_course_user_idx')
+
+    def test_user_subscriptions(self):
+        """Подписки пользователя в порядке keyset-пагинации, новые первыми."""
+        queryset = CourseSubscription.objects.filter(user=self.user).order_by('-created_at', '-id')
+
+        self.assertUsesIndex(queryset, 'subscription_user_created_idx')
+
+    def test_owned_courses(self):
+        """Свои курсы в порядке списка."""
+        queryset = Course.objects.filter(owner_id=self.user.id).order_by('id')
+
+        self.assertUsesIndex(queryset, 'course_owner_id_idx')
+
+    def test_owned_lessons(self):
+        """Свои уроки в порядке keyset-пагинации списка уроков."""
+        queryset = Lesson.objects.filter(owner_id=self.user.id).order_by('course_id', 'id')
+
+        self.assertUsesIndex(queryset, 'lesson_owner_course_id_idx')
+
+    def test_inactive_users(self):
+        """Выборка deactivate_inactive_users читает оба частичных индекса."""
+        now = timezone.now()
+        # Планировщику нужна статистика, где неактивных пользователей мало
+        User.objects.bulk_create(
+            User(email=f'user{i}@example.com', last_login=now if i % 10 else None, date_joined=now)
+            for i in range(2000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE users_user')
+        month_ago = now - timedelta(days=30)
+        queryset = User.objects.filter(is_active=True, last_login__lt=month_ago) | User.objects.filter(
+            is_active=True, last_login__isnull=True, date_joined__lt=month_ago
+        )
+
+        self.assertUsesIndex(queryset, 'user_active_last_login_idx', 'user_active_never_logged_idx')
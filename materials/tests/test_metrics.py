@@ -0,0 +1,112 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from materials.metrics import get_registry
+from materials.models import Course
+from materials.tasks import deactivate_inactive_users
+
+User = get_user_model()
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTestCase(APITestCase):
+    """Тесты для метрик Prometheus."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.client.force_authenticate(user=self.user)
+        Course.objects.create(title='Курс', description='Описание', owner=self.user)
+
+    def test_request_latency_and_queries(self):
+        """Длительность и число SQL-запросов записываются по имени маршрута."""
+        labels = {'view': 'course-list', 'method': 'GET', 'status': '2xx'}
+        requests_before = sample('lms_http_request_duration_seconds_count', **labels)
+        queries_before = sample('lms_http_request_db_queries_sum', view='course-list')
+
+        self.client.get('/api/courses/')
+
+        self.assertEqual(sample('lms_http_request_duration_seconds_count', **labels), requests_before + 1)
+        self.assertGreater(sample('lms_http_request_db_queries_sum', view='course-list'), queries_before)
+
+    def test_unresolved_path(self):
+        """Неизвестные пути попадают в один ряд."""
+        labels = {'view': 'unresolved', 'method': 'GET', 'status': '4xx'}
+        before = sample('lms_http_request_duration_seconds_count', **labels)
+
+        self.client.get('/api/unknown/12345/')
+
+        self.assertEqual(sample('lms_http_request_duration_seconds_count', **labels), before + 1)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_cache_lookups(self):
+        """Промах и попадание в кэш каталога."""
+        miss = sample('lms_cache_lookups_total', scope='course-list', result='miss')
+        hit = sample('lms_cache_lookups_total', scope='course-list', result='hit')
+
+        self.client.get('/api/courses/')
+        self.client.get('/api/courses/')
+
+        self.assertEqual(sample('lms_cache_lookups_total', scope='course-list', result='miss'), miss + 1)
+        self.assertEqual(sample('lms_cache_lookups_total', scope='course-list', result='hit'), hit + 1)
+
+    def test_celery_task_metrics(self):
+        """Длительность и состояние задачи Celery."""
+        task = 'materials.tasks.deactivate_inactive_users'
+        succeeded = sample('lms_celery_tasks_total', task=task, state='success')
+        durations = sample('lms_celery_task_duration_seconds_count', task=task)
+
+        deactivate_inactive_users.apply()
+
+        self.assertEqual(sample('lms_celery_tasks_total', task=task, state='success'), succeeded + 1)
+        self.assertEqual(sample('lms_celery_task_duration_seconds_count', task=task), durations + 1)
+
+    def test_metrics_endpoint(self):
+        """Эндпоинт отдаёт метрики в текстовом формате Prometheus."""
+        self.client.get('/api/courses/')
+        self.client.force_login(User.objects.create_user(email='staff@example.com', password='password',
+                                                         is_staff=True))
+
+        response = self.client.get('/metrics/', HTTP_ACCEPT='text/plain')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'lms_http_request_duration_seconds_bucket{', response.content)
+
+    def test_metrics_closed_without_token(self):
+        """Без METRICS_TOKEN метрики отдаются только сотрудникам."""
+        self.assertEqual(self.client.get('/metrics/').status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/metrics/').status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        """С METRICS_TOKEN нужен Bearer-токен."""
+        self.assertEqual(self.client.get('/metrics/').status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_multiprocess_registry(self):
+        """В многопроцессном режиме метрики собираются из общего каталога."""
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory}):
+                registry = get_registry()
+
+        self.assertIsNot(registry, REGISTRY)
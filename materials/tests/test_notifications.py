@@ -0,0 +1,215 @@
+from smtplib import SMTPException
+from unittest import mock
+
+import fakeredis
+import redis
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail import get_connection
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from config.celery import app
+from materials.models import Course, CourseSubscription, Lesson
+from materials.notifications import DIGEST_LIMIT, build_digest, get_changes_key, get_window_key
+from materials.tasks import flush_course_changes, get_chunk_bounds, send_course_update_chunk, \
+    send_course_update_notification
+
+User = get_user_model()
+
+
+class CourseUpdateNotificationTestCase(APITestCase):
+    """Тесты пакетной рассылки об обновлении курса."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.course = Course.objects.create(title='Курс', description='Описание')
+        users = User.objects.bulk_create(
+            User(email=f'user{i}@example.com', first_name='Иван' if i == 0 else '') for i in range(5)
+        )
+        CourseSubscription.objects.bulk_create(CourseSubscription(user=user, course=self.course) for user in users)
+        other_course = Course.objects.create(title='Другой курс', description='Описание')
+        CourseSubscription.objects.create(user=users[0], course=other_course)
+
+    def test_messages(self):
+        """Письмо каждому подписчику курса, обращение по имени, если оно есть."""
+        with CaptureQueriesContext(connection) as captured:
+            sent = send_course_update_chunk(self.course.id, self.course.title)
+
+        self.assertEqual(len(captured), 1)
+        self.assertEqual(sent, 5)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         [f'user{i}@example.com' for i in range(5)])
+        bodies = {message.to[0]: message.body for message in mail.outbox}
+        self.assertTrue(bodies['user0@example.com'].startswith('Здравствуйте, Иван!'))
+        self.assertTrue(bodies['user1@example.com'].startswith('Здравствуйте!'))
+        self.assertEqual(mail.outbox[0].subject, 'Обновление в курсе "Курс"')
+
+    @override_settings(NOTIFICATION_CHUNK_SIZE=2)
+    def test_chunks_share_connection(self):
+        """Пачки по NOTIFICATION_CHUNK_SIZE уходят через одно соединение."""
+        backend = get_connection()
+
+        with mock.patch('materials.tasks.get_connection', return_value=backend), \
+                mock.patch.object(backend, 'open', wraps=backend.open) as opened, \
+                mock.patch.object(backend, 'send_messages', wraps=backend.send_messages) as sent:
+            send_course_update_chunk(self.course.id, self.course.title)
+
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual([len(call.args[0]) for call in sent.call_args_list], [2, 2, 1])
+        self.assertEqual(len(mail.outbox), 5)
+
+
+@override_settings(NOTIFICATION_TASK_CHUNK_SIZE=2)
+class CourseUpdateFanOutTestCase(APITestCase):
+    """Тесты разбиения рассылки на задачи Celery по диапазонам подписчиков."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.course = Course.objects.create(title='Курс', description='Описание')
+        self.users = User.objects.bulk_create(User(email=f'user{i}@example.com') for i in range(5))
+        CourseSubscription.objects.bulk_create(CourseSubscription(user=user, course=self.course) for user in self.users)
+
+        # Задачи выполняются синхронно, без брокера
+        eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, 'task_always_eager', eager)
+
+    def test_chunk_bounds(self):
+        """Диапазоны user_id по NOTIFICATION_TASK_CHUNK_SIZE подписчиков."""
+        user_ids = [user.id for user in self.users]
+
+        with CaptureQueriesContext(connection) as captured:
+            bounds = get_chunk_bounds(self.course.id, 2)
+
+        self.assertEqual(len(captured), 1)
+        self.assertEqual(bounds, [(user_ids[0], user_ids[2]), (user_ids[2], user_ids[4]), (user_ids[4], None)])
+        self.assertEqual(get_chunk_bounds(self.course.id + 100, 2), [])
+
+    def test_fan_out(self):
+        """Каждый диапазон — отдельная задача, итог собирает chord."""
+        with mock.patch('materials.tasks.send_course_update_chunk.s', wraps=send_course_update_chunk.s) as chunks, \
+                mock.patch('materials.tasks.summarize_course_update_notification.run',
+                           wraps=lambda results, title: sum(results)) as summary:
+            result = send_course_update_notification(self.course.id, self.course.title)
+
+        self.assertEqual(result, 'Рассылка по курсу Курс запущена, частей: 3')
+        self.assertEqual(chunks.call_count, 3)
+        self.assertEqual(summary.call_args.args, ([2, 2, 1], 'Курс'))
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(NOTIFICATION_TASK_CHUNK_SIZE=5, NOTIFICATION_CHUNK_SIZE=2)
+    def test_retry_resumes_from_failed_batch(self):
+        """Повтор после ошибки SMTP продолжает с пачки, на которой она случилась."""
+        backend = get_connection()
+        failing = self.users[2].email
+        send_messages = backend.send_messages
+        batches = []
+
+        def fail_once(messages):
+            recipients = [message.to[0] for message in messages]
+            batches.append(recipients)
+            if failing in recipients and len(batches) == 2:
+                raise SMTPException('Соединение разорвано')
+            return send_messages(messages)
+
+        with mock.patch('materials.tasks.get_connection', return_value=backend), \
+                mock.patch.object(backend, 'send_messages', side_effect=fail_once):
+            send_course_update_notification(self.course.id, self.course.title)
+
+        emails = [user.email for user in self.users]
+        self.assertEqual(batches, [emails[:2], emails[2:4], emails[2:4], emails[4:]])
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), sorted(emails))
+
+
+class CourseChangeDigestTestCase(APITestCase):
+    """Тесты окна сбора изменений курса и сводки в письме."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='owner@example.com',
+            password='password'
+        )
+        self.course = Course.objects.create(title='Курс', description='Описание', owner=self.user)
+        self.lessons = [
+            Lesson.objects.create(title=f'Урок {i}', description='Описание', course=self.course, owner=self.user)
+            for i in range(2)
+        ]
+        CourseSubscription.objects.create(user=self.user, course=self.course)
+        self.client.force_authenticate(user=self.user)
+
+        self.redis = fakeredis.FakeRedis()
+        patcher = mock.patch('materials.notifications.get_redis', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch('materials.notifications.flush_course_changes.apply_async')
+        self.schedule = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, 'task_always_eager', eager)
+
+    def edit(self):
+        self.client.patch(f'/api/lessons/{self.lessons[0].id}/update/', {'title': 'Урок 0'}, format='json')
+        self.client.patch(f'/api/lessons/{self.lessons[1].id}/update/', {'description': 'Новое'}, format='json')
+        self.client.patch(f'/api/lessons/{self.lessons[0].id}/update/', {'title': 'Введение', 'description': 'Новое'},
+                          format='json')
+        self.client.patch(f'/api/courses/{self.course.id}/', {'description': 'Новое'}, format='json')
+
+    def test_window_opened_once(self):
+        """Правки внутри окна планируют одну рассылку и копятся в списке."""
+        self.edit()
+
+        self.schedule.assert_called_once_with((self.course.id,), countdown=settings.NOTIFICATION_DEBOUNCE_SECONDS)
+        self.assertEqual(self.redis.llen(get_changes_key(self.course.id)), 4)
+        self.assertEqual(self.redis.ttl(get_window_key(self.course.id)), settings.NOTIFICATION_DEBOUNCE_SECONDS)
+
+    def test_flush_sends_digest(self):
+        """Одно письмо со сводкой всех правок; окно закрывается."""
+        self.edit()
+
+        flush_course_changes(self.course.id)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(
+            'Изменения:\n'
+            '- Урок "Введение": название, описание\n'
+            '- Урок "Урок 1": описание\n'
+            '- Курс "Курс": описание\n',
+            mail.outbox[0].body,
+        )
+        self.assertFalse(self.redis.exists(get_changes_key(self.course.id), get_window_key(self.course.id)))
+        self.assertEqual(flush_course_changes(self.course.id), f'Нет изменений курса {self.course.id} для рассылки')
+
+        self.client.patch(f'/api/courses/{self.course.id}/', {'description': 'Ещё новее'}, format='json')
+        self.assertEqual(self.schedule.call_count, 2)
+
+    def test_digest_limit(self):
+        """Длинная сводка обрезается до DIGEST_LIMIT строк."""
+        changes = [{'key': f'lesson:{i}', 'object': 'Урок', 'title': f'Урок {i}', 'fields': []}
+                   for i in range(DIGEST_LIMIT + 5)]
+
+        lines = build_digest(changes)
+
+        self.assertEqual(len(lines), DIGEST_LIMIT + 1)
+        self.assertEqual(lines[-1], 'и ещё изменений: 5')
+
+    def test_redis_unavailable(self):
+        """При недоступном Redis правка проходит без рассылки."""
+        client = mock.Mock()
+        client.pipeline.return_value.execute.side_effect = redis.ConnectionError
+
+        with mock.patch('materials.notifications.get_redis', return_value=client):
+            response = self.client.patch(f'/api/lessons/{self.lessons[0].id}/update/', {'title': 'Новое'},
+                                         format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.schedule.assert_not_called()
@@ -0,0 +1,101 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from materials.models import Course, Lesson
+
+User = get_user_model()
+
+
+class KeysetPaginationTestCase(APITestCase):
+    """Тесты для режима ?pagination=cursor."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.courses = [
+            Course.objects.create(title=f'Курс {i}', description='Описание', owner=self.user)
+            for i in range(3)
+        ]
+        # Уроки создаются вперемешку, чтобы порядок id не совпадал с порядком курсов
+        for i in range(4):
+            for course in reversed(self.courses):
+                Lesson.objects.create(
+                    title=f'Урок {i}',
+                    description='Описание',
+                    course=course,
+                    owner=self.user
+                )
+
+    def collect(self, url, params):
+        items = []
+        pages = 0
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            items.extend(response.data['results'])
+            pages += 1
+            if not response.data['next']:
+                return items, pages
+            response = self.client.get(response.data['next'])
+
+    def test_lessons_cursor_order(self):
+        """Уроки обходятся в порядке (course_id, id) без пропусков и повторов."""
+        items, pages = self.collect('/api/lessons/', {'pagination': 'cursor', 'page_size': 5})
+
+        expected = list(Lesson.objects.order_by('course_id', 'id').values_list('id', flat=True))
+        self.assertEqual([item['id'] for item in items], expected)
+        self.assertEqual(pages, 3)
+
+    def test_courses_cursor_order(self):
+        """Курсы обходятся по id."""
+        items, pages = self.collect('/api/courses/', {'pagination': 'cursor', 'page_size': 2})
+
+        self.assertEqual([item['id'] for item in items], [course.id for course in self.courses])
+
+    def test_cursor_mode_has_no_count(self):
+        """В режиме курсора не выполняется COUNT(*)."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/lessons/', {'pagination': 'cursor'})
+
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries))
+
+    def test_page_number_is_default(self):
+        """Без параметра остаётся постраничная пагинация."""
+        response = self.client.get('/api/lessons/')
+
+        self.assertEqual(response.data['count'], 12)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_invalid_cursor(self):
+        """Неверный курсор возвращает 404."""
+        response = self.client.get('/api/lessons/', {'pagination': 'cursor', 'cursor': 'broken'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_value_types(self):
+        """Курсор с неверными типами значений возвращает 404, а не 500."""
+        cursors = {
+            '/api/courses/': [['abc'], [None], [[1]]],
+            '/api/lessons/': [['abc', 1], [1, {'id': 1}]],
+            '/api/subscriptions/': [['abc', 1], [1, 1]],
+        }
+        for url, positions in cursors.items():
+            for position in positions:
+                cursor = base64.urlsafe_b64encode(json.dumps(position).encode('ascii')).decode('ascii')
+                with self.subTest(url=url, position=position):
+                    response = self.client.get(url, {'pagination': 'cursor', 'cursor': cursor})
+
+                    self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,146 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.test import APITestCase, APIClient
+
+from materials.models import Course, Lesson
+from materials.permissions import IsModerator, IsOwner, NotModerator, get_permissions_filter
+
+User = get_user_model()
+
+
+class PermissionScopeTestCase(APITestCase):
+    """Тесты прав на уровне выборки и фильтра ?owner=me."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            password='password'
+        )
+        self.other = User.objects.create_user(
+            email='other@example.com',
+            password='password'
+        )
+        self.moderator = User.objects.create_user(
+            email='mod@example.com',
+            password='password'
+        )
+        self.moderator.groups.add(Group.objects.create(name='moderators'))
+
+        self.course = Course.objects.create(title='Курс', description='Описание', owner=self.owner)
+        self.lesson = Lesson.objects.create(title='Урок', description='Описание', course=self.course,
+                                            owner=self.owner)
+        other_course = Course.objects.create(title='Чужой курс', description='Описание', owner=self.other)
+        Lesson.objects.create(title='Чужой урок', description='Описание', course=other_course, owner=self.other)
+
+    def get_filter(self, user, permissions):
+        request = type('Request', (), {'user': user})()
+        return get_permissions_filter(permissions, request, None)
+
+    def test_filters(self):
+        """Фильтры прав, в том числе составных."""
+        owned = Lesson.objects.filter(owner=self.owner)
+
+        self.assertIsNone(self.get_filter(self.owner, [IsAuthenticated()]))
+        self.assertIsNone(self.get_filter(self.moderator, [(IsOwner | IsModerator)()]))
+        self.assertQuerySetEqual(
+            Lesson.objects.filter(self.get_filter(self.owner, [IsAuthenticated(), (IsOwner | IsModerator)()])),
+            owned, ordered=False,
+        )
+        self.assertFalse(Lesson.objects.filter(self.get_filter(self.moderator, [IsOwner(), NotModerator()])))
+        self.assertQuerySetEqual(
+            Lesson.objects.filter(self.get_filter(self.owner, [(~IsOwner)()])),
+            Lesson.objects.exclude(owner=self.owner), ordered=False,
+        )
+
+    def test_nonowner_update_forbidden(self):
+        """Чужой урок не выбирается, ответ 403."""
+        self.client.force_authenticate(user=self.other)
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.patch(f'/api/lessons/{self.lesson.id}/update/', {'title': 'Чужое'},
+                                         format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        lesson_selects = [query['sql'] for query in captured
+                          if query['sql'].startswith('SELECT') and 'FROM "materials_lesson"' in query['sql']]
+        self.assertIn('"owner_id"', lesson_selects[0].split('WHERE', 1)[1])
+        self.lesson.refresh_from_db()
+        self.assertEqual(self.lesson.title, 'Урок')
+
+    def test_nonowner_course_update_forbidden(self):
+        """Чужой курс не выбирается для изменения и удаления, ответ 403."""
+        self.client.force_authenticate(user=self.other)
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.patch(f'/api/courses/{self.course.id}/', {'title': 'Чужое'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        course_selects = [query['sql'] for query in captured
+                          if query['sql'].startswith('SELECT') and 'FROM "materials_course"' in query['sql']]
+        self.assertIn('"owner_id"', course_selects[0].split('WHERE', 1)[1])
+        self.assertEqual(self.client.delete(f'/api/courses/{self.course.id}/').status_code,
+                         status.HTTP_403_FORBIDDEN)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.title, 'Курс')
+
+    @mock.patch('materials.views.record_course_change')
+    def test_moderator_course_update(self, mock_notification):
+        """Модератор изменяет чужой курс, но не удаляет его; просмотр доступен всем."""
+        self.client.force_authenticate(user=self.moderator)
+
+        response = self.client.patch(f'/api/courses/{self.course.id}/', {'title': 'Новое'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.delete(f'/api/courses/{self.course.id}/').status_code,
+                         status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.client.get(f'/api/courses/{self.course.id}/').status_code, status.HTTP_200_OK)
+
+    @mock.patch('materials.views.record_course_change')
+    def test_moderator_update_any(self, mock_notification):
+        """Модератор изменяет чужой урок."""
+        self.client.force_authenticate(user=self.moderator)
+
+        response = self.client.patch(f'/api/lessons/{self.lesson.id}/update/', {'title': 'Новое'},
+                                     format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_missing_lesson_not_found(self):
+        """Несуществующий урок — 404, а не 403."""
+        self.client.force_authenticate(user=self.other)
+
+        response = self.client.delete('/api/lessons/0/delete/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_delete(self):
+        """Удалить урок может только владелец."""
+        self.client.force_authenticate(user=self.other)
+        response = self.client.delete(f'/api/lessons/{self.lesson.id}/delete/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.delete(f'/api/lessons/{self.lesson.id}/delete/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_owned_lists(self):
+        """?owner=me оставляет в списках только объекты пользователя."""
+        self.client.force_authenticate(user=self.owner)
+
+        response = self.client.get('/api/lessons/', {'owner': 'me'})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.lesson.id])
+
+        response = self.client.get('/api/courses/', {'owner': 'me'})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.course.id])
+
+        response = self.client.get('/api/courses/')
+        self.assertEqual(response.data['count'], 2)
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from materials.models import Course, Lesson
+from materials.profiling import RequestProfile, get_current_profile, profile_section
+
+User = get_user_model()
+
+
+class ProfilingMiddlewareTestCase(APITestCase):
+    """Тесты для ProfilingMiddleware и заголовка Server-Timing."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.staff = User.objects.create_user(
+            email='staff@example.com',
+            password='password',
+            is_staff=True
+        )
+        course = Course.objects.create(title='Курс', description='Описание', owner=self.user)
+        Lesson.objects.create(title='Урок', description='Описание', course=course, owner=self.user)
+
+    def test_staff_server_timing(self):
+        """Сотрудник с X-Profile: 1 получает SQL, сериализацию и рендер."""
+        self.client.force_authenticate(user=self.staff)
+
+        response = self.client.get('/api/lessons/', HTTP_X_PROFILE='1')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = {item.split(';')[0] for item in response['Server-Timing'].split(', ')}
+        self.assertEqual(metrics, {'db', 'serialize', 'render', 'total'})
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="SQL: \d+"')
+
+    def test_no_header_for_regular_user(self):
+        """Обычный пользователь заголовок не получает."""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get('/api/lessons/', HTTP_X_PROFILE='1')
+
+        self.assertNotIn('Server-Timing', response)
+
+    def test_not_profiled_by_default(self):
+        """Без выборки и заголовка профиль не собирается."""
+        self.client.force_authenticate(user=self.staff)
+
+        with mock.patch('materials.profiling.RequestProfile') as profile_class:
+            response = self.client.get('/api/lessons/')
+
+        profile_class.assert_not_called()
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_SLOW_REQUEST_MS=0, PROFILING_TOP_QUERIES=2)
+    def test_slow_request_logged(self):
+        """Медленный запрос из выборки пишется в лог с самыми долгими SQL-запросами."""
+        self.client.force_authenticate(user=self.user)
+
+        with self.assertLogs('materials.profiling', level='WARNING') as logs:
+            self.client.get('/api/courses/')
+
+        self.assertEqual(len(logs.records), 1)
+        message = logs.records[0].getMessage()
+        self.assertIn('GET /api/courses/', message)
+        self.assertEqual(message.count(' мс: SELECT'), 2)
+
+    @mock.patch('stripe.Product.create')
+    def test_stripe_section(self, product_create):
+        """Вызовы Stripe попадают в участок stripe."""
+        from materials.services import create_stripe_product
+
+        profile = RequestProfile()
+        with mock.patch('materials.profiling._current_profile') as current:
+            current.get.return_value = profile
+            create_stripe_product(Course(title='Курс', description='Описание'))
+
+        self.assertIn('stripe', profile.sections)
+
+    def test_nested_sections_counted_once(self):
+        """Вложенный участок с тем же именем не удваивает время."""
+        profile = RequestProfile()
+        with profile.section('serialize'):
+            with profile.section('serialize'):
+                pass
+        self.assertEqual(list(profile.sections), ['serialize'])
+
+    def test_section_without_profile(self):
+        """Вне профилируемого запроса участки ничего не делают."""
+        self.assertIsNone(get_current_profile())
+        with profile_section('serialize'):
+            self.assertIsNone(get_current_profile())
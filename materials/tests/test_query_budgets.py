@@ -0,0 +1,136 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APITestCase, APIClient
+
+from materials.models import Course, Lesson, Payment
+from materials.tests.query_budget import VIDEO_URL, QueryBudgetMixin, get_budgeted_routes
+
+User = get_user_model()
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class QueryBudgetTestCase(QueryBudgetMixin, APITestCase):
+    """Число запросов каждого маршрута не зависит от объёма данных и укладывается в бюджет."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.other_user = User.objects.create_user(
+            email='other@example.com',
+            password='password'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def own_course(self):
+        return {'pk': Course.objects.filter(owner=self.user).latest('id').id}
+
+    def own_lesson(self):
+        return {'pk': Lesson.objects.filter(owner=self.user).latest('id').id}
+
+    def lesson_data(self):
+        return {'title': 'Новый урок', 'description': 'Описание', 'video_url': VIDEO_URL,
+                'course': Course.objects.latest('id').id}
+
+    def test_every_route_has_budget(self):
+        """У каждого маршрута есть бюджет и тест на каждый его метод."""
+        for name, view_class in get_budgeted_routes().items():
+            budget = getattr(view_class, 'query_budget', None)
+            self.assertTrue(budget, f'{view_class.__name__}.query_budget не задан')
+            for method in budget:
+                test_name = f'test_{name.replace("-", "_")}_{method.lower()}'
+                self.assertTrue(hasattr(self, test_name), f'Нет теста {test_name}')
+
+    def test_course_list_get(self):
+        self.assertQueryBudget('course-list', 'GET')
+
+    def test_course_list_post(self):
+        self.assertQueryBudget('course-list', 'POST', data={'title': 'Курс', 'description': 'Описание'})
+
+    def test_course_detail_get(self):
+        self.assertQueryBudget('course-detail', 'GET', kwargs=self.own_course)
+
+    @mock.patch('materials.views.record_course_change')
+    def test_course_detail_patch(self, send_notification):
+        self.assertQueryBudget('course-detail', 'PATCH', kwargs=self.own_course, data={'title': 'Курс'})
+
+    def test_course_detail_delete(self):
+        self.assertQueryBudget('course-detail', 'DELETE', kwargs=self.own_course)
+
+    def test_lesson_list_get(self):
+        self.assertQueryBudget('lesson-list', 'GET')
+
+    def test_lesson_list_post(self):
+        self.assertQueryBudget('lesson-list', 'POST', data=self.lesson_data)
+
+    def test_lesson_bulk_create_post(self):
+        self.assertQueryBudget('lesson-bulk-create', 'POST', data=lambda: [self.lesson_data()] * 5)
+
+    def test_lesson_detail_get(self):
+        self.assertQueryBudget('lesson-detail', 'GET', kwargs=self.own_lesson)
+
+    @mock.patch('materials.views.record_course_change')
+    def test_lesson_update_patch(self, send_notification):
+        self.assertQueryBudget('lesson-update', 'PATCH', kwargs=self.own_lesson, data={'title': 'Урок'})
+
+    def test_lesson_delete_delete(self):
+        self.assertQueryBudget('lesson-delete', 'DELETE', kwargs=self.own_lesson)
+
+    def test_course_subscription_post(self):
+        self.assertQueryBudget('course-subscription', 'POST', data=lambda: {
+            'course_id': Course.objects.exclude(subscriptions__user=self.user).latest('id').id
+        })
+
+    def test_subscription_list_get(self):
+        self.assertQueryBudget('subscription-list', 'GET')
+
+    def test_subscription_bulk_post(self):
+        self.assertQueryBudget('subscription-bulk', 'POST', data=lambda: {
+            'course_ids': list(Course.objects.values_list('id', flat=True))
+        })
+
+    def test_subscription_bulk_delete(self):
+        self.assertQueryBudget('subscription-bulk', 'DELETE', data=lambda: {
+            'course_ids': list(Course.objects.values_list('id', flat=True))
+        })
+
+    def test_catalog_search_get(self):
+        self.assertQueryBudget('catalog-search', 'GET', data={'q': 'курс'})
+
+    @mock.patch('materials.views.create_stripe_session')
+    @mock.patch('materials.views.create_stripe_price')
+    @mock.patch('materials.views.create_stripe_product')
+    def test_payment_create_post(self, create_product, create_price, create_session):
+        create_session.side_effect = lambda *args: mock.Mock(id=f'cs_new_{create_session.call_count}',
+                                                             url='https://checkout.stripe.com/test')
+        self.assertQueryBudget('payment-create', 'POST', data=lambda: {
+            'course_id': Course.objects.latest('id').id
+        })
+
+    @mock.patch('materials.views.get_session_status', return_value='paid')
+    def test_payment_check_status_get(self, get_session_status):
+        self.assertQueryBudget('payment-check-status', 'GET', data=lambda: {
+            'payment_id': Payment.objects.filter(user=self.user).latest('id').id
+        })
+
+    def test_payment_list_get(self):
+        self.assertQueryBudget('payment-list', 'GET')
+
+    def test_payment_export_get(self):
+        self.assertQueryBudget('payment-export', 'GET')
+
+    def test_user_register_post(self):
+        self.assertQueryBudget('user-register', 'POST', data=lambda: {
+            'email': f'new{self.seeded}@example.com', 'password': 'password', 'phone': '+79990000000'
+        })
+
+    def test_user_profile_get(self):
+        self.assertQueryBudget('user-profile', 'GET', kwargs={'pk': self.user.pk})
+
+    def test_user_profile_patch(self):
+        self.assertQueryBudget('user-profile', 'PATCH', kwargs={'pk': self.user.pk}, data={'city': 'Москва'})
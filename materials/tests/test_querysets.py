@@ -0,0 +1,155 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from materials.models import Course, Lesson, CourseSubscription
+
+User = get_user_model()
+
+
+# Замеряются запросы к базе: кэш каталога не должен отдавать ответы
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class CourseQuerySetTestCase(APITestCase):
+    """Тесты для аннотированной выборки курсов."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.other_user = User.objects.create_user(
+            email='other@example.com',
+            password='password'
+        )
+
+    def create_courses(self, count, lessons_per_course=2):
+        for i in range(count):
+            course = Course.objects.create(
+                title=f'Курс {i}',
+                description='Описание курса',
+                owner=self.user if i % 2 else self.other_user
+            )
+            for j in range(lessons_per_course):
+                Lesson.objects.create(
+                    title=f'Урок {j}',
+                    description='Описание урока',
+                    course=course,
+                    owner=course.owner
+                )
+            if i % 3 == 0:
+                CourseSubscription.objects.create(user=self.user, course=course)
+
+    def test_for_catalog_annotations(self):
+        """Тест аннотаций lessons_count и is_subscribed."""
+        self.create_courses(3)
+
+        courses = list(Course.objects.for_catalog(self.user))
+
+        self.assertEqual([course.lessons_count for course in courses], [2, 2, 2])
+        self.assertEqual([course.is_subscribed for course in courses], [True, False, False])
+
+    def test_for_catalog_anonymous(self):
+        """Тест аннотации is_subscribed для анонимного пользователя."""
+        self.create_courses(1)
+        anonymous = type('AnonymousUser', (), {'is_authenticated': False})()
+
+        course = Course.objects.for_catalog(anonymous).get()
+
+        self.assertFalse(course.is_subscribed)
+
+    def get_list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/courses/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_course_list_constant_queries(self):
+        """Число запросов к списку курсов не зависит от числа курсов на странице."""
+        self.create_courses(1)
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get('/api/courses/')
+        first = response.data['results'][0]
+        self.assertEqual(first['lessons_count'], 2)
+        self.assertTrue(first['is_subscribed'])
+        self.assertFalse(first['is_owner'])
+        self.assertEqual(len(first['lessons']), 2)
+
+        single = self.get_list_queries()
+        self.create_courses(9)
+        full_page = self.get_list_queries()
+        self.assertEqual(single, full_page)
+
+
+class SparseFieldsTestCase(APITestCase):
+    """Тесты для параметров ?fields и ?expand."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.course = Course.objects.create(
+            title='Тестовый курс',
+            description='Описание тестового курса',
+            price=100,
+            owner=self.user
+        )
+        self.lesson = Lesson.objects.create(
+            title='Тестовый урок',
+            description='Описание тестового урока',
+            course=self.course,
+            owner=self.user
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_course_list_fields(self):
+        """В ответе и в SQL только запрошенные поля."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/courses/', {'fields': 'id,title'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'id': self.course.id, 'title': 'Тестовый курс'}])
+        sql = '\n'.join(query['sql'] for query in queries)
+        self.assertNotIn('"materials_lesson"', sql)
+        self.assertNotIn('EXISTS', sql)
+        self.assertNotIn('"materials_course"."description"', sql)
+
+    def test_course_list_price(self):
+        """?fields=id,title,price — только эти поля, цена строкой, как DecimalField DRF."""
+        expected = {'id': self.course.id, 'title': 'Тестовый курс', 'price': '100.00'}
+
+        response = self.client.get('/api/courses/', {'fields': 'id,title,price'})
+        self.assertEqual(response.data['results'], [expected])
+
+        response = self.client.get(f'/api/courses/{self.course.id}/', {'fields': 'id,title,price'})
+        self.assertEqual(response.data, expected)
+
+    def test_course_list_expand_lessons(self):
+        """?expand добавляет вложенные уроки к выбранным полям."""
+        response = self.client.get('/api/courses/', {'fields': 'id,is_owner', 'expand': 'lessons'})
+
+        course = response.data['results'][0]
+        self.assertEqual(set(course), {'id', 'is_owner', 'lessons'})
+        self.assertTrue(course['is_owner'])
+        self.assertEqual(course['lessons'][0]['title'], 'Тестовый урок')
+
+    def test_course_detail_without_fields(self):
+        """Без параметров возвращаются все поля."""
+        response = self.client.get(f'/api/courses/{self.course.id}/')
+
+        self.assertIn('lessons', response.data)
+        self.assertIn('lessons_count', response.data)
+
+    def test_lesson_detail_fields(self):
+        """Выбор полей для урока."""
+        response = self.client.get(f'/api/lessons/{self.lesson.id}/', {'fields': 'id,course'})
+
+        self.assertEqual(response.data, {'id': self.lesson.id, 'course': self.course.id})
@@ -0,0 +1,100 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APIClient
+
+from materials import parsers, renderers
+from materials.models import Course, Lesson
+from materials.parsers import FastJSONParser
+from materials.renderers import FastJSONRenderer
+
+User = get_user_model()
+
+
+class FastJSONTestCase(APITestCase):
+    """Тесты для рендерера и парсера на orjson."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.data = {
+            'price': Decimal('1990.50'),
+            'created_at': timezone.now(),
+            'naive': datetime.datetime(2024, 1, 2, 3, 4, 5, 678901),
+            'day': datetime.date(2024, 1, 2),
+            'id': uuid.uuid4(),
+            'title': 'Курс с разделителем',
+            'lessons': [{'id': 1, 'rating': None, 'active': True, 'score': 4.5}],
+        }
+
+    def test_same_bytes_as_drf(self):
+        """Вывод совпадает с JSONRenderer DRF байт в байт."""
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_fallback_without_orjson(self):
+        """Без orjson используется стандартный рендерер."""
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_indent_uses_drf(self):
+        """Запрошенный отступ обрабатывает стандартный рендерер."""
+        rendered = FastJSONRenderer().render({'id': 1}, 'application/json; indent=2')
+
+        self.assertEqual(rendered, b'{\n  "id": 1\n}')
+
+    def test_parser(self):
+        """Разбор тела и ошибка для неверного JSON."""
+        parser = FastJSONParser()
+
+        self.assertEqual(parser.parse(io.BytesIO('{"title": "Урок"}'.encode())), {'title': 'Урок'})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"title": NaN}'))
+        with mock.patch.object(parsers, 'orjson', None):
+            self.assertEqual(parser.parse(io.BytesIO(b'[1]')), [1])
+
+    def test_parser_long_integers(self):
+        """Целые шире 64 бит разбираются без потери точности, как в JSONParser."""
+        body = b'{"id": 123456789012345678901234567890, "ids": [-9223372036854775809, 1]}'
+
+        with mock.patch.object(parsers.orjson, 'loads', wraps=parsers.orjson.loads) as loads:
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(body)),
+                             {'id': 123456789012345678901234567890, 'ids': [-9223372036854775809, 1]})
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(b'{"id": 9223372036854775}')),
+                             {'id': 9223372036854775})
+
+        self.assertEqual(loads.call_count, 1)
+
+    def test_api_round_trip(self):
+        """JSON-запрос и ответ через API."""
+        course = Course.objects.create(title='Курс', description='Описание', owner=self.user)
+
+        response = self.client.post('/api/lessons/', {
+            'title': 'Урок',
+            'description': 'Описание',
+            'video_url': 'https://www.youtube.com/watch?v=test',
+            'course': course.id,
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()['title'], 'Урок')
+        self.assertTrue(Lesson.objects.filter(title='Урок').exists())
+
+    def test_api_malformed_json(self):
+        """Неверный JSON возвращает 400."""
+        response = self.client.post('/api/lessons/', data='{"title":', content_type='application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,106 @@
+import json
+
+from django.contrib.auth import get_user_model
+from rest_framework.request import Request
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory, force_authenticate
+
+from materials.models import Course, Lesson, CourseSubscription
+from materials.row_serializers import CourseRowSerializer, LessonRowSerializer, get_field_map
+from materials.serializers import CourseSerializer, LessonSerializer
+
+User = get_user_model()
+
+
+class RowSerializerTestCase(APITestCase):
+    """Быстрые сериализаторы отдают тот же JSON, что и сериализаторы DRF."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.other_user = User.objects.create_user(
+            email='other@example.com',
+            password='password'
+        )
+        for i in range(3):
+            course = Course.objects.create(
+                title=f'Курс {i}',
+                description='Описание курса',
+                preview='courses/preview.png' if i else '',
+                owner=self.user if i % 2 else None,
+                rating=i
+            )
+            for j in range(2):
+                Lesson.objects.create(
+                    title=f'Урок {j}',
+                    description='Описание урока',
+                    preview='lessons/preview.png' if j else None,
+                    video_url='https://www.youtube.com/watch?v=test',
+                    course=course,
+                    owner=self.other_user
+                )
+        CourseSubscription.objects.create(user=self.user, course=course)
+
+        request = APIRequestFactory().get('/api/courses/')
+        force_authenticate(request, user=self.user)
+        self.request = Request(request)
+        self.request.user = self.user
+
+    def assertSameJson(self, first, second):
+        self.assertEqual(json.dumps(first, ensure_ascii=False), json.dumps(second, ensure_ascii=False))
+
+    def serialize_courses(self, fields=None):
+        expected = CourseSerializer(
+            Course.objects.for_catalog(self.user), many=True,
+            context={'request': self.request, 'fields': fields} if fields else {'request': self.request}
+        ).data
+        row_serializer = CourseRowSerializer(fields, self.request)
+        rows = Course.objects.with_is_subscribed(self.user).order_by('id').values(*row_serializer.columns)
+        return expected, row_serializer.serialize(rows)
+
+    def test_courses_identical(self):
+        """Все поля курса, включая вложенные уроки, ссылки на превью и даты."""
+        expected, actual = self.serialize_courses()
+
+        self.assertSameJson(expected, actual)
+        self.assertTrue(actual[1]['preview'].startswith('http://testserver/'))
+        self.assertTrue(actual[2]['is_subscribed'])
+
+    def test_courses_selected_fields(self):
+        """Выбранные поля в том же порядке."""
+        expected, actual = self.serialize_courses({'id', 'is_owner', 'lessons', 'title'})
+
+        self.assertSameJson(expected, actual)
+
+    def test_unknown_fields_not_cached(self):
+        """Неизвестные поля из ?fields= не добавляют записей в кэш карт полей."""
+        CourseRowSerializer({'id', 'title'}, self.request)
+        cached = get_field_map.cache_info().currsize
+
+        for i in range(10):
+            row_serializer = CourseRowSerializer({'id', 'title', f'junk{i}'}, self.request)
+
+        self.assertEqual(get_field_map.cache_info().currsize, cached)
+        self.assertEqual([name for name, *_ in row_serializer.field_map], ['id', 'title'])
+
+    def test_lessons_identical(self):
+        """Все поля урока."""
+        lessons = Lesson.objects.order_by('id')
+        expected = LessonSerializer(lessons, many=True, context={'request': self.request}).data
+        row_serializer = LessonRowSerializer(request=self.request)
+
+        self.assertSameJson(expected, row_serializer.serialize(lessons.values(*row_serializer.columns)))
+
+    def test_lesson_list_endpoint(self):
+        """Список уроков через API совпадает с LessonSerializer."""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get('/api/lessons/', {'page_size': 20})
+
+        request = Request(APIRequestFactory().get('/api/lessons/'))
+        expected = LessonSerializer(Lesson.objects.order_by('id'), many=True,
+                                    context={'request': request}).data
+        self.assertSameJson(response.json()['results'], expected)
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from materials.models import Course, Lesson
+
+User = get_user_model()
+
+
+class CatalogSearchTestCase(APITestCase):
+    """Тесты для полнотекстового поиска."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.python = Course.objects.create(
+            title='Программирование на Python',
+            description='Базовый курс для начинающих разработчиков',
+            owner=self.user
+        )
+        self.design = Course.objects.create(
+            title='Веб-дизайн',
+            description='Композиция, цвет и типографика',
+            owner=self.user
+        )
+        self.lesson = Lesson.objects.create(
+            title='Функции',
+            description='Функции и модули в программировании на Python',
+            course=self.design,
+            owner=self.user
+        )
+
+    def test_search_ranked(self):
+        """Совпадение в названии выше совпадения в описании."""
+        response = self.client.get('/api/search/', {'q': 'программированию'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        results = response.data['results']
+        self.assertEqual([(item['type'], item['id']) for item in results],
+                         [('course', self.python.id), ('lesson', self.lesson.id)])
+        self.assertEqual(results[1]['course_id'], self.design.id)
+        self.assertIn('<mark>Программирование</mark>', results[0]['title_highlight'])
+        self.assertIn('<mark>', results[1]['snippet'])
+
+    def test_highlight_escaped(self):
+        """Текст пользователя экранируется, разметкой остаются только теги <mark>."""
+        self.python.title = '<script>alert(1)</script> Программирование'
+        self.python.description = 'Курс <img src=x onerror=alert(1)> по программированию'
+        self.python.save()
+
+        response = self.client.get('/api/search/', {'q': 'программирование'})
+
+        result = response.data['results'][0]
+        self.assertEqual(result['title_highlight'],
+                         '&lt;script&gt;alert(1)&lt;/script&gt; <mark>Программирование</mark>')
+        self.assertNotIn('<img', result['snippet'])
+        self.assertIn('&lt;img', result['snippet'])
+        self.assertIn('<mark>программированию</mark>', result['snippet'])
+
+    def test_search_vector_updated_on_save(self):
+        """Вектор поиска обновляется при изменении записи."""
+        self.design.description = 'Анимация интерфейсов'
+        self.design.save()
+
+        response = self.client.get('/api/search/', {'q': 'анимация'})
+
+        self.assertEqual([item['id'] for item in response.data['results']], [self.design.id])
+
+    def test_search_no_results(self):
+        """Запрос без совпадений."""
+        response = self.client.get('/api/search/', {'q': 'астрономия'})
+
+        self.assertEqual(response.data['count'], 0)
+
+    def test_search_empty_query(self):
+        """Пустой запрос возвращает 400."""
+        response = self.client.get('/api/search/', {'q': ' '})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+
+    def test_search_vector_not_serialized(self):
+        """search_vector не попадает в ответ урока."""
+        response = self.client.get(f'/api/lessons/{self.lesson.id}/')
+
+        self.assertNotIn('search_vector', response.data)
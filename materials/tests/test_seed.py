@@ -0,0 +1,56 @@
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from materials.models import Course, CourseSubscription, Lesson, Payment
+
+User = get_user_model()
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class SeedAndBenchmarkTestCase(APITestCase):
+    """Тесты для команд seed_lms и benchmark_api."""
+
+    def seed(self):
+        call_command('seed_lms', users=20, courses=5, lessons_per_course=3, subscriptions_per_user=2,
+                     payments=10, batch_size=7, random_seed=1, stdout=io.StringIO())
+
+    def test_seed_volumes(self):
+        """Созданы заданные объёмы, счётчики курсов согласованы."""
+        self.seed()
+        self.seed()
+
+        self.assertEqual(User.objects.count(), 40)
+        self.assertEqual(Course.objects.count(), 10)
+        self.assertEqual(Lesson.objects.count(), 30)
+        self.assertEqual(CourseSubscription.objects.count(), 80)
+        self.assertEqual(Payment.objects.count(), 20)
+        for course in Course.objects.annotate(actual_lessons=Count('lessons', distinct=True),
+                                              actual_subscribers=Count('subscriptions', distinct=True)):
+            self.assertEqual(course.lessons_count, course.actual_lessons)
+            self.assertEqual(course.subscribers_count, course.actual_subscribers)
+
+    def test_benchmark_report(self):
+        """Результат замера записывается в JSON по каждому сценарию."""
+        self.seed()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'result.json')
+            call_command('benchmark_api', requests=3, warmup=1, scenario=['course-list', 'payment-list'],
+                         output=path, stderr=io.StringIO())
+            with open(path, encoding='utf-8') as result:
+                report = json.load(result)
+
+        self.assertEqual(set(report['scenarios']), {'course-list', 'payment-list'})
+        self.assertEqual(report['dataset']['courses'], 5)
+        scenario = report['scenarios']['course-list']
+        self.assertLessEqual(scenario['p50_ms'], scenario['p99_ms'])
+        self.assertGreater(scenario['queries_per_request'], 0)
+        self.assertGreater(scenario['throughput_rps'], 0)
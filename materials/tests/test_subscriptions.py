@@ -0,0 +1,183 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient, APITransactionTestCase
+
+from materials.models import Course, CourseSubscription
+
+User = get_user_model()
+
+
+class SubscriptionToggleTestCase(APITestCase):
+    """Тесты переключения подписки одним запросом."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.course = Course.objects.create(title='Курс', description='Описание')
+        self.client.force_authenticate(user=self.user)
+
+    def toggle(self, course_id):
+        return self.client.post('/api/subscription/', {'course_id': course_id}, format='json')
+
+    def test_toggle(self):
+        """Подписка добавляется и удаляется с прежними ответами."""
+        response = self.toggle(self.course.id)
+        self.assertEqual(response.data, {'message': 'подписка добавлена'})
+        self.assertTrue(CourseSubscription.objects.filter(user=self.user, course=self.course).exists())
+
+        response = self.toggle(self.course.id)
+        self.assertEqual(response.data, {'message': 'подписка удалена'})
+        self.assertFalse(CourseSubscription.objects.exists())
+
+    def test_counter_and_updated_at(self):
+        """subscribers_count и дата изменения курса сдвигаются тем же запросом."""
+        updated_at = self.course.updated_at
+
+        self.toggle(self.course.id)
+
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.subscribers_count, 1)
+        self.assertGreater(self.course.updated_at, updated_at)
+
+    def test_missing_course(self):
+        """Несуществующий курс — 404, подписка не создаётся."""
+        self.assertEqual(self.toggle(self.course.id + 1).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.toggle('abc').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.toggle(None).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(CourseSubscription.objects.exists())
+
+
+@mock.patch('materials.views.CourseSubscriptionView.throttle_classes', [])
+class SubscriptionConcurrencyTestCase(APITransactionTestCase):
+    """Параллельные переключения не приводят к ошибкам и расхождению счётчика."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.course = Course.objects.create(title='Курс', description='Описание')
+        self.users = [
+            User.objects.create_user(email=f'user{i}@example.com', password='password')
+            for i in range(8)
+        ]
+
+    def run_parallel(self, users):
+        barrier = threading.Barrier(len(users))
+        responses = []
+
+        def toggle(user):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            try:
+                barrier.wait()
+                responses.append(client.post('/api/subscription/', {'course_id': self.course.id}, format='json'))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=toggle, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return responses
+
+    def assertCounterConsistent(self):
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.subscribers_count, CourseSubscription.objects.filter(course=self.course).count())
+
+    def test_same_user(self):
+        """Параллельные клики одного пользователя."""
+        responses = self.run_parallel([self.users[0]] * 8)
+
+        self.assertEqual([response.status_code for response in responses], [status.HTTP_200_OK] * 8)
+        self.assertLessEqual(CourseSubscription.objects.count(), 1)
+        self.assertCounterConsistent()
+
+    def test_many_users(self):
+        """Параллельные подписки разных пользователей на один курс."""
+        responses = self.run_parallel(self.users)
+
+        self.assertEqual([response.status_code for response in responses], [status.HTTP_200_OK] * 8)
+        self.assertEqual(CourseSubscription.objects.count(), 8)
+        self.assertCounterConsistent()
+
+
+class SubscriptionBulkTestCase(APITestCase):
+    """Тесты пакетной подписки и списка подписок."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.courses = Course.objects.bulk_create(
+            Course(title=f'Курс {i}', description='Описание') for i in range(200)
+        )
+        self.course_ids = [course.id for course in self.courses]
+        self.client.force_authenticate(user=self.user)
+
+    def assertSubscribersCount(self, course_ids, count):
+        self.assertEqual(
+            set(Course.objects.filter(id__in=course_ids).values_list('subscribers_count', flat=True)), {count}
+        )
+
+    def test_subscribe_many(self):
+        """Подписка на 200 курсов одним запросом к базе."""
+        CourseSubscription.objects.toggle(self.user.id, self.course_ids[0])
+        missing = self.course_ids[-1] + 1
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post('/api/subscriptions/bulk/', {'course_ids': self.course_ids + [missing]},
+                                        format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(captured), 1)
+        self.assertEqual(response.data, {'subscribed': self.course_ids[1:], 'not_found': [missing]})
+        self.assertEqual(CourseSubscription.objects.filter(user=self.user).count(), 200)
+        self.assertSubscribersCount(self.course_ids, 1)
+
+    def test_unsubscribe_many(self):
+        """Отписка удаляет только существующие подписки и сдвигает счётчики."""
+        CourseSubscription.objects.subscribe_many(self.user.id, self.course_ids[:10])
+
+        response = self.client.delete('/api/subscriptions/bulk/', {'course_ids': self.course_ids[5:15]},
+                                      format='json')
+
+        self.assertEqual(response.data, {'unsubscribed': self.course_ids[5:10]})
+        self.assertSubscribersCount(self.course_ids[:5], 1)
+        self.assertSubscribersCount(self.course_ids[5:], 0)
+
+    def test_invalid_course_ids(self):
+        """Пустой список и не числа — 400."""
+        for data in ({}, {'course_ids': []}, {'course_ids': ['abc']}, {'course_ids': list(range(1, 1002))}):
+            response = self.client.post('/api/subscriptions/bulk/', data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list(self):
+        """Список подписок: keyset-пагинация, новые первыми, только свои."""
+        other = User.objects.create_user(email='other@example.com', password='password')
+        CourseSubscription.objects.subscribe_many(other.id, self.course_ids)
+        for course_id in self.course_ids[:25]:
+            CourseSubscription.objects.toggle(self.user.id, course_id)
+
+        response = self.client.get('/api/subscriptions/')
+        first_page = response.data['results']
+        self.assertEqual(len(first_page), 20)
+        self.assertEqual(first_page[0]['course'], {
+            'id': self.course_ids[24], 'title': 'Курс 24', 'preview': None, 'price': '0.00', 'rating': 0,
+            'lessons_count': 0,
+        })
+
+        response = self.client.get(response.data['next'])
+        self.assertIsNone(response.data['next'])
+        course_ids = [item['course']['id'] for item in first_page + response.data['results']]
+        self.assertEqual(course_ids, self.course_ids[24::-1])
@@ -0,0 +1,108 @@
+from unittest import mock
+
+import fakeredis
+import redis
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from materials.models import Course
+from materials.throttling import TOKEN_BUCKET_SCRIPT, parse_rate
+
+User = get_user_model()
+
+
+def get_throttle_rates(**rates):
+    return {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates}
+
+
+@override_settings(REST_FRAMEWORK=get_throttle_rates(subscriptions='3/min', subscriptions_bulk='2/min', payments='2/hour'))
+class TokenBucketThrottleTestCase(APITestCase):
+    """Тесты TokenBucketThrottle на локальном fakeredis."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.other = User.objects.create_user(
+            email='other@example.com',
+            password='password'
+        )
+        self.course = Course.objects.create(title='Курс', description='Описание', owner=self.user)
+
+        self.redis = fakeredis.FakeRedis()
+        patcher = mock.patch('materials.throttling.get_bucket_script',
+                             return_value=self.redis.register_script(TOKEN_BUCKET_SCRIPT))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def subscribe(self):
+        return self.client.post('/api/subscription/', {'course_id': self.course.id}, format='json')
+
+    def test_parse_rate(self):
+        """Ёмкость ведра и период пополнения."""
+        self.assertEqual(parse_rate('10/min'), (10, 60))
+        self.assertEqual(parse_rate('100/day'), (100, 86400))
+
+    def test_bucket_exhausted(self):
+        """После исчерпания ведра ответ 429 с Retry-After."""
+        self.client.force_authenticate(user=self.user)
+
+        remaining = [self.subscribe()['X-RateLimit-Remaining'] for _ in range(3)]
+        response = self.subscribe()
+
+        self.assertEqual(remaining, ['2', '1', '0'])
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['X-RateLimit-Limit'], '3')
+        self.assertEqual(response['X-RateLimit-Remaining'], '0')
+        self.assertEqual(response['Retry-After'], '20')
+
+    def test_buckets_per_user_and_view(self):
+        """Вёдра раздельные для пользователей и представлений."""
+        self.client.force_authenticate(user=self.user)
+        for _ in range(3):
+            self.subscribe()
+
+        response = self.client.post('/api/payment/create/', {}, format='json')
+        self.assertEqual(response['X-RateLimit-Remaining'], '1')
+        response = self.client.post('/api/subscriptions/bulk/', {'course_ids': [self.course.id]}, format='json')
+        self.assertEqual(response['X-RateLimit-Remaining'], '1')
+
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.subscribe().status_code, status.HTTP_200_OK)
+        self.assertEqual(set(self.redis.keys()), {
+            f'throttle:payments:{self.user.pk}'.encode(),
+            f'throttle:subscriptions:{self.user.pk}'.encode(),
+            f'throttle:subscriptions_bulk:{self.user.pk}'.encode(),
+            f'throttle:subscriptions:{self.other.pk}'.encode(),
+        })
+
+    def test_refill(self):
+        """Токены пополняются со временем."""
+        self.client.force_authenticate(user=self.user)
+        for _ in range(3):
+            self.subscribe()
+
+        # Сдвигаем время последнего пополнения на 20 секунд назад: один токен
+        key = f'throttle:subscriptions:{self.user.pk}'
+        self.redis.hset(key, 'ts', float(self.redis.hget(key, 'ts')) - 20)
+
+        response = self.subscribe()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-RateLimit-Remaining'], '0')
+
+    def test_redis_unavailable(self):
+        """При недоступном Redis запросы пропускаются без заголовков."""
+        self.client.force_authenticate(user=self.user)
+        script = mock.Mock(side_effect=redis.ConnectionError)
+
+        with mock.patch('materials.throttling.get_bucket_script', return_value=script):
+            response = self.subscribe()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-RateLimit-Remaining', response)
@@ -0,0 +1,136 @@
+"""
+Ограничение частоты запросов алгоритмом token bucket в Redis.
+
+У каждого пользователя своё ведро на каждое представление. Ёмкость и
+скорость пополнения задаются в DEFAULT_THROTTLE_RATES по throttle_scope
+представления: '10/min' — до 10 запросов подряд и 10 новых токенов в
+минуту. Проверка — один вызов Lua-скрипта, который атомарно пополняет
+ведро по времени сервера Redis и списывает токен. При недоступном Redis
+запросы пропускаются.
+"""
+import logging
+import math
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+# Таймаут Redis в секундах: медленный Redis не должен задерживать запросы
+REDIS_TIMEOUT = 0.25
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# KEYS[1] — ведро; ARGV: ёмкость, токенов в секунду, списываемые токены.
+# Возвращает: пропущен ли запрос, остаток токенов, мс до следующего токена
+# (при отказе) и мс до полного ведра.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+else
+    wait = math.ceil((requested - tokens) / rate * 1000)
+end
+
+local reset = math.ceil((capacity - tokens) / rate * 1000)
+redis.call('HSET', KEYS[1], 'tokens', string.format('%.6f', tokens), 'ts', string.format('%.6f', now))
+-- Полное ведро равно отсутствующему, поэтому ключ живёт до заполнения
+redis.call('PEXPIRE', KEYS[1], math.max(reset, 1000))
+return {allowed, math.floor(tokens), wait, reset}
+"""
+
+
+@lru_cache(maxsize=None)
+def get_bucket_script():
+    """Зарегистрированный скрипт: вызов идёт через EVALSHA, одним обращением к Redis."""
+    client = redis.Redis.from_url(settings.THROTTLE_REDIS_URL, socket_timeout=REDIS_TIMEOUT,
+                                  socket_connect_timeout=REDIS_TIMEOUT)
+    return client.register_script(TOKEN_BUCKET_SCRIPT)
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60): ёмкость ведра и период пополнения в секундах."""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket по пользователю и throttle_scope представления.
+
+    Состояние последнего ведра сохраняется в request.rate_limit для
+    заголовков X-RateLimit-*.
+    """
+    scope_attr = 'throttle_scope'
+    cache_format = 'throttle:{scope}:{ident}'
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_rate(self, view):
+        scope = getattr(view, self.scope_attr, None)
+        if scope is None:
+            return None, None
+        return scope, api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+
+    def get_cache_key(self, request, view, scope):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format.format(scope=scope, ident=ident)
+
+    def allow_request(self, request, view):
+        scope, rate = self.get_rate(view)
+        if rate is None:
+            return True
+
+        capacity, period = parse_rate(rate)
+        key = self.get_cache_key(request, view, scope)
+        try:
+            result = get_bucket_script()(keys=[key], args=[capacity, capacity / period, 1])
+        except redis.RedisError as e:
+            logger.warning('Redis для ограничения частоты недоступен: %s', e)
+            return True
+
+        allowed, remaining, wait_ms, reset_ms = result
+        request.rate_limit = (capacity, remaining, math.ceil(reset_ms / 1000))
+        self.wait_seconds = wait_ms / 1000
+        return bool(allowed)
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class RateLimitHeadersMixin:
+    """Добавляет к ответу X-RateLimit-Limit, X-RateLimit-Remaining и X-RateLimit-Reset."""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        rate_limit = getattr(request, 'rate_limit', None)
+        if rate_limit is not None:
+            limit, remaining, reset = rate_limit
+            response['X-RateLimit-Limit'] = limit
+            response['X-RateLimit-Remaining'] = remaining
+            response['X-RateLimit-Reset'] = reset
+        return response
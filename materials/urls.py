@@ -8,10 +8,22 @@ urlpatterns = [
 
     # Маршруты для уроков
     path('lessons/', views.LessonListCreateView.as_view(), name='lesson-list'),
+    path('lessons/bulk/', views.LessonBulkCreateView.as_view(), name='lesson-bulk-create'),
     path('lessons/<int:pk>/', views.LessonDetailView.as_view(), name='lesson-detail'),
+    path('lessons/<int:pk>/update/', views.LessonUpdateView.as_view(), name='lesson-update'),
+    path('lessons/<int:pk>/delete/', views.LessonDeleteView.as_view(), name='lesson-delete'),
+
+    # Подписка на курс
+    path('subscription/', views.CourseSubscriptionView.as_view(), name='course-subscription'),
+    path('subscriptions/', views.SubscriptionListView.as_view(), name='subscription-list'),
+    path('subscriptions/bulk/', views.SubscriptionBulkView.as_view(), name='subscription-bulk'),
+
+    # Поиск по каталогу
+    path('search/', views.CatalogSearchView.as_view(), name='catalog-search'),
 
     # Платежные маршруты (сохраняем)
     path('payment/create/', views.PaymentCreateView.as_view(), name='payment-create'),
     path('payment/check-status/', views.PaymentStatusView.as_view(), name='payment-check-status'),
     path('payment/', views.PaymentListView.as_view(), name='payment-list'),
+    path('payment/export/', views.PaymentExportView.as_view(), name='payment-export'),
 ]
\ No newline at end of file
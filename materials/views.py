@@ -1,8 +1,13 @@
 import datetime
-from datetime import timedelta
+import hashlib
+from collections import Counter
 
+from django.db import transaction
+from django.db.models import Max
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import generics, viewsets
@@ -11,19 +16,230 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .cache import LIVE_FIELDS, add_live_fields, bump_catalog_version, get_catalog_deleted_at, get_or_build
+from .exports import EXPORT_FORMATS, iter_export
 from .models import Course, CourseSubscription
 from .models import Lesson
 from .models import Payment
-from .paginators import MaterialsPagination
-from .permissions import IsModerator, IsOwner, NotModerator, ModeratorOrOwner
-from .serializers import CourseSerializer, LessonSerializer
+from .notifications import describe_change, record_course_change
+from .paginators import MaterialsPagination, SearchPagination, SubscriptionPagination
+from .permissions import IsModerator, IsOwner, NotModerator, ModeratorOrOwner, get_permissions_filter
+from .row_serializers import CourseRowSerializer, LessonRowSerializer
+from .search import build_results, make_search_query, search_catalog
+from .serializers import CourseSerializer, LessonSerializer, LessonBulkCreateSerializer, CourseIdsSerializer, \
+    SubscriptionSerializer
 from .services import create_stripe_product, create_stripe_price, create_stripe_session, \
     get_session_status
 from .services import retrieve_stripe_session
-from .tasks import send_course_update_notification
+from .throttling import RateLimitHeadersMixin, TokenBucketThrottle
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы по ETag и Last-Modified.
+
+    Валидаторы считаются дешёвым запросом к дате изменения, поэтому ответ
+    304 Not Modified отдаётся без загрузки и сериализации объекта.
+    """
+
+    def get_conditional_response(self, request, last_modified, *validators):
+        """Возвращает ответ 304 или None, если клиенту нужны данные."""
+        parts = [request.get_full_path(), last_modified.isoformat() if last_modified else '']
+        parts.extend(str(value) for value in validators)
+        self.etag = quote_etag(hashlib.md5(':'.join(parts).encode()).hexdigest())
+        self.last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+        if response is not None:
+            self.set_conditional_headers(response)
+        return response
+
+    def set_conditional_headers(self, response):
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified)
+        # Ответ зависит от пользователя
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+
+class PermissionScopeMixin:
+    """
+    Сужает get_queryset() фильтрами Q(), которые дают классы прав.
+
+    Объекты, к которым у пользователя нет доступа, не выбираются из базы.
+    Если объекта нет в суженной выборке, но он существует, ответ 403, а не
+    404, как при проверке прав на уровне объекта. Параметр ?owner=me
+    оставляет в списке только объекты пользователя.
+    """
+    owner_query_param = 'owner'
+
+    def get_permissions_filter(self):
+        return get_permissions_filter(self.get_permissions(), self.request, self)
+
+    def scope_queryset(self, queryset):
+        condition = self.get_permissions_filter()
+        return queryset if condition is None else queryset.filter(condition)
+
+    def get_queryset(self):
+        return self.scope_queryset(super().get_queryset())
+
+    def is_owner_filter(self):
+        return self.request.query_params.get(self.owner_query_param) == 'me'
+
+    def filter_owned(self, queryset):
+        if self.is_owner_filter():
+            return queryset.filter(owner_id=self.request.user.id)
+        return queryset
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if self.get_permissions_filter() is not None:
+                lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+                unscoped = super().get_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+                if unscoped.exists():
+                    self.permission_denied(self.request)
+            raise
+
+
+class CourseCatalogMixin(PermissionScopeMixin, ConditionalGetMixin):
+    """
+    Выборка курсов с аннотациями и полями, запрошенными через ?fields и ?expand.
+
+    Список и просмотр курса отдаются из кэша каталога: в нём хранится общая
+    часть ответа, а subscribers_count, is_subscribed и is_owner добавляются
+    для каждого запроса. ?ordering=popular сортирует по числу подписчиков и
+    всегда читается из базы. Курсор keyset-режима хранит subscribers_count
+    последней записи: если число подписчиков меняется между запросами
+    страниц, курс может пропасть из обхода или встретиться дважды.
+    """
+
+    def is_popular_ordering(self):
+        return self.request.query_params.get('ordering') == 'popular'
+
+    @property
+    def keyset_ordering(self):
+        if self.is_popular_ordering():
+            return ('-subscribers_count', '-id')
+        return ('id',)
+
+    def get_catalog_queryset(self, fields):
+        queryset = Course.objects.for_catalog(self.request.user, fields)
+        if self.is_popular_ordering():
+            queryset = queryset.popular()
+        return CourseSerializer.restrict_queryset(queryset, fields)
+
+    def get_queryset(self):
+        return self.scope_queryset(self.get_catalog_queryset(CourseSerializer.get_requested_fields(self.request)))
+
+    def get_row_queryset(self, row_serializer):
+        """Строки values() для быстрого сериализатора списка."""
+        queryset = Course.objects.order_by('id')
+        if self.is_popular_ordering():
+            queryset = queryset.popular()
+        columns = row_serializer.columns | {'owner_id'}
+        if 'is_subscribed' in columns:
+            queryset = queryset.with_is_subscribed(self.request.user)
+        columns |= {field.lstrip('-') for field in self.keyset_ordering}
+        return self.filter_owned(self.scope_queryset(queryset)).values(*columns)
+
+    def get_shared_serializer(self, *args, fields, **kwargs):
+        """Сериализатор без полей, зависящих от пользователя."""
+        context = self.get_serializer_context()
+        context['fields'] = fields
+        return self.get_serializer(*args, context=context, **kwargs)
+
+    def get_shared_fields(self, fields):
+        if fields is None:
+            fields = set(CourseSerializer.Meta.fields)
+        return fields - set(LIVE_FIELDS)
+
+    def get_list_validators(self, request):
+        """
+        Дата последнего изменения каталога — один запрос Max(updated_at) по индексу.
+
+        Создание и изменение курса, его уроков и любых подписок на него
+        сдвигают updated_at курса, поэтому подписки пользователя отдельно не
+        проверяются. Удаление курса Max(updated_at) не сдвигает, его время
+        хранится в кэше.
+        """
+        last_modified = Course.objects.aggregate(last_modified=Max('updated_at'))['last_modified']
+        last_modified = max(filter(None, (last_modified, get_catalog_deleted_at())), default=None)
+        return last_modified, request.user.id
+
+    def get_detail_validators(self, request):
+        """Дата изменения курса и подписка пользователя на него."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = (
+            Course.objects.with_is_subscribed(request.user)
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list('updated_at', 'is_subscribed')
+            .first()
+        )
+        if row is None:
+            return None
+        return row[0], request.user.id, row[1]
+
+    def list(self, request, *args, **kwargs):
+        not_modified = self.get_conditional_response(request, *self.get_list_validators(request))
+        if not_modified is not None:
+            return not_modified
+
+        fields = CourseSerializer.get_requested_fields(request)
+
+        def build():
+            row_serializer = CourseRowSerializer(self.get_shared_fields(fields), request)
+            queryset = self.filter_queryset(self.get_row_queryset(row_serializer))
+            page = self.paginate_queryset(queryset)
+            rows = list(queryset) if page is None else page
+            data = row_serializer.serialize(rows)
+            if page is not None:
+                data = self.get_paginated_response(data).data
+            return {
+                'data': data,
+                'course_ids': [row['id'] for row in rows],
+                'owner_ids': [row['owner_id'] for row in rows],
+            }
+
+        # Список своих курсов зависит от пользователя, а порядок по популярности —
+        # от подписок, которые версию каталога не меняют: в общий кэш они не попадают
+        if self.is_owner_filter() or self.is_popular_ordering():
+            entry = build()
+        else:
+            entry = get_or_build('course-list', request, build)
+        items = entry['data']['results'] if 'results' in entry['data'] else entry['data']
+        add_live_fields(items, entry['course_ids'], entry['owner_ids'], request.user, fields)
+        return self.set_conditional_headers(Response(entry['data']))
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = self.get_detail_validators(request)
+        if validators is not None:
+            not_modified = self.get_conditional_response(request, *validators)
+            if not_modified is not None:
+                return not_modified
+
+        fields = CourseSerializer.get_requested_fields(request)
+
+        def build():
+            shared_fields = self.get_shared_fields(fields)
+            queryset = self.filter_queryset(self.get_catalog_queryset(shared_fields | {'is_owner'}))
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            course = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            self.check_object_permissions(request, course)
+            return {
+                'data': self.get_shared_serializer(course, fields=shared_fields).data,
+                'course_ids': [course.id],
+                'owner_ids': [course.owner_id],
+            }
+
+        entry = get_or_build('course-detail', request, build)
+        add_live_fields([entry['data']], entry['course_ids'], entry['owner_ids'], request.user, fields)
+        return self.set_conditional_headers(Response(entry['data']))
+
+
+class CourseViewSet(CourseCatalogMixin, viewsets.ModelViewSet):
     """ViewSet для работы с курсами."""
 
     queryset = Course.objects.all()
@@ -44,74 +260,139 @@ class CourseViewSet(viewsets.ModelViewSet):
         serializer.save(owner=self.request.user)
 
 
-class LessonDetailView(generics.RetrieveAPIView):
+class LessonDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     """Контроллер для просмотра урока."""
 
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 2}
+
+    def get_queryset(self):
+        fields = LessonSerializer.get_requested_fields(self.request)
+        return LessonSerializer.restrict_queryset(super().get_queryset(), fields)
+
+    def retrieve(self, request, *args, **kwargs):
+        updated_at = Lesson.objects.filter(pk=self.kwargs['pk']).values_list('updated_at', flat=True).first()
+        if updated_at is not None:
+            not_modified = self.get_conditional_response(request, updated_at)
+            if not_modified is not None:
+                return not_modified
+
+        def build():
+            return self.get_serializer(self.get_object()).data
 
+        response = Response(get_or_build('lesson-detail', request, build))
+        return self.set_conditional_headers(response)
 
-class LessonUpdateView(generics.UpdateAPIView):
+
+class LessonUpdateView(PermissionScopeMixin, generics.UpdateAPIView):
     """Контроллер для обновления урока."""
 
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
     permission_classes = [IsAuthenticated, IsOwner | IsModerator]
+    query_budget = {'PATCH': 4}
     pagination_class = MaterialsPagination
 
     def perform_update(self, serializer):
         lesson = serializer.save()
 
-        # Получаем связанный курс
-        course = lesson.course
-        four_hours_ago = timezone.now() - timedelta(hours=4)
-
-        # Проверка времени последнего уведомления
-        if not course.last_notification_sent or course.last_notification_sent < four_hours_ago:
-            course.last_notification_sent = timezone.now()
-            course.save(update_fields=['last_notification_sent'])
-
-            # Запускаем асинхронную рассылку
-            send_course_update_notification.delay(course.id, course.title)
+        # Изменение попадает в сводку ближайшего уведомления подписчикам курса
+        record_course_change(lesson.course_id, describe_change(lesson, serializer.validated_data))
 
 
-class LessonDeleteView(generics.DestroyAPIView):
+class LessonDeleteView(PermissionScopeMixin, generics.DestroyAPIView):
     """Контроллер для удаления урока."""
 
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
     permission_classes = [IsAuthenticated, IsOwner]
+    query_budget = {'DELETE': 4}
 
 
-class CourseSubscriptionView(APIView):
+class CourseSubscriptionView(RateLimitHeadersMixin, APIView):
     """Управление подпиской на курс"""
+    query_budget = {'POST': 1}
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'subscriptions'
 
     def post(self, request, *args, **kwargs):
-        user = request.user
         course_id = request.data.get('course_id')
 
         if not course_id:
             return Response({"error": "Не указан ID курса"}, status=400)
 
-        course_item = get_object_or_404(Course, pk=course_id)
-        subs_item = CourseSubscription.objects.filter(user=user, course=course_item)
+        try:
+            course_id = int(course_id)
+        except (TypeError, ValueError):
+            raise Http404
 
-        # Если подписка есть - удаляем
-        if subs_item.exists():
-            subs_item.delete()
-            message = 'подписка удалена'
-        # Если подписки нет - создаем
-        else:
-            CourseSubscription.objects.create(user=user, course=course_item)
-            message = 'подписка добавлена'
+        # Один запрос без гонки между проверкой и изменением
+        subscribed = CourseSubscription.objects.toggle(request.user.id, course_id)
+        if subscribed is None:
+            raise Http404
+        message = 'подписка добавлена' if subscribed else 'подписка удалена'
 
         return Response({"message": message})
 
 
+class SubscriptionListView(generics.ListAPIView):
+    """Подписки пользователя, новые первыми, с краткими сведениями о курсах"""
+    serializer_class = SubscriptionSerializer
+    pagination_class = SubscriptionPagination
+    keyset_ordering = ('-created_at', '-id')
+    query_budget = {'GET': 1}
+
+    def get_queryset(self):
+        queryset = CourseSubscription.objects.filter(user_id=self.request.user.id)
+        return SubscriptionSerializer.restrict_queryset(queryset)
+
+
+class SubscriptionBulkView(RateLimitHeadersMixin, APIView):
+    """Пакетная подписка (POST) и отписка (DELETE) по списку ID курсов"""
+    query_budget = {'POST': 1, 'DELETE': 1}
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'subscriptions_bulk'
+
+    def get_course_ids(self, request):
+        serializer = CourseIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data['course_ids']
+
+    @swagger_auto_schema(
+        operation_description="Подписка на список курсов одним запросом",
+        request_body=CourseIdsSerializer,
+        responses={
+            200: "ID курсов с новыми подписками и ненайденных курсов",
+            400: "Неверный список ID курсов"
+        }
+    )
+    def post(self, request):
+        course_ids = self.get_course_ids(request)
+        subscribed, found = CourseSubscription.objects.subscribe_many(request.user.id, course_ids)
+        return Response({
+            "subscribed": subscribed,
+            "not_found": sorted(set(course_ids) - set(found)),
+        })
+
+    @swagger_auto_schema(
+        operation_description="Отписка от списка курсов одним запросом",
+        request_body=CourseIdsSerializer,
+        responses={
+            200: "ID курсов, подписки на которые удалены",
+            400: "Неверный список ID курсов"
+        }
+    )
+    def delete(self, request):
+        course_ids = self.get_course_ids(request)
+        unsubscribed = CourseSubscription.objects.unsubscribe_many(request.user.id, course_ids)
+        return Response({"unsubscribed": unsubscribed})
+
+
 # В файле views.py добавьте:
 
-class LessonListCreateView(generics.ListCreateAPIView):
+class LessonListCreateView(PermissionScopeMixin, generics.ListCreateAPIView):
     @swagger_auto_schema(
         operation_description="Получение списка уроков или создание нового урока",
         request_body=LessonSerializer,
@@ -127,25 +408,118 @@ class LessonListCreateView(generics.ListCreateAPIView):
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 2, 'POST': 3}
     pagination_class = MaterialsPagination
 
+    @property
+    def keyset_ordering(self):
+        # Номера страниц идут по id, как раньше; курсор — по индексу (course, id)
+        if self.request.query_params.get(self.pagination_class.pagination_mode_query_param) == 'cursor':
+            return ('course_id', 'id')
+        return ('id',)
+
+    def list(self, request, *args, **kwargs):
+        # Только чтение: строки values() без экземпляров моделей и полей DRF
+        row_serializer = LessonRowSerializer(LessonSerializer.get_requested_fields(request), request)
+        columns = row_serializer.columns | set(self.keyset_ordering)
+        queryset = self.filter_owned(self.get_queryset()).order_by(*self.keyset_ordering).values(*columns)
+        queryset = self.filter_queryset(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(row_serializer.serialize(page))
+        return Response(row_serializer.serialize(queryset))
+
     def perform_create(self, serializer):
         """Сохраняет владельца при создании урока."""
         serializer.save(owner=self.request.user)
 
-    def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
+
+class LessonBulkCreateView(APIView):
+    """Пакетное создание уроков"""
+    permission_classes = [IsAuthenticated]
+    query_budget = {'POST': 5}
+    max_batch_size = 1000
+
+    @swagger_auto_schema(
+        operation_description="Создание списка уроков одной транзакцией",
+        request_body=LessonSerializer(many=True),
+        responses={
+            201: LessonSerializer(many=True),
+            400: "Ошибки валидации по каждому уроку"
+        }
+    )
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "Ожидается непустой список уроков"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.max_batch_size:
+            return Response({"error": f"Не более {self.max_batch_size} уроков за запрос"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Все курсы пакета загружаются одним запросом
+        course_ids = set()
+        for item in items:
+            try:
+                course_ids.add(int(item.get('course')))
+            except (AttributeError, TypeError, ValueError):
+                # Ошибку по этому уроку вернёт сериализатор
+                continue
+        courses = Course.objects.only('id').in_bulk(course_ids)
+
+        serializer = LessonBulkCreateSerializer(
+            data=items, many=True, context={'request': request, 'courses': courses}
+        )
         if not serializer.is_valid():
-            print(f"Validation errors: {serializer.errors}")
-        serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
-        headers = self.get_success_headers(serializer.data)
-        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        lessons = [Lesson(owner=request.user, **data) for data in serializer.validated_data]
+        with transaction.atomic():
+            lessons = Lesson.objects.bulk_create(lessons)
+            # bulk_create не отправляет сигналы, поэтому счётчики и кэш обновляются здесь
+            for course_id, count in Counter(lesson.course_id for lesson in lessons).items():
+                Course.objects.filter(pk=course_id).shift_counters(lessons_count=count)
+        bump_catalog_version()
+
+        return Response(LessonSerializer(lessons, many=True).data, status=status.HTTP_201_CREATED)
+
+
+class CatalogSearchView(APIView):
+    """Полнотекстовый поиск по курсам и урокам"""
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 3}
+    pagination_class = SearchPagination
+
+    @swagger_auto_schema(
+        operation_description="Поиск по названиям и описаниям курсов и уроков",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="Поисковый запрос",
+                              type=openapi.TYPE_STRING, required=True)
+        ],
+        responses={
+            200: "Результаты поиска по релевантности",
+            400: "Не указан поисковый запрос"
+        }
+    )
+    def get(self, request):
+        text = request.query_params.get('q', '').strip()
+
+        if not text:
+            return Response({"error": "Не указан поисковый запрос"}, status=status.HTTP_400_BAD_REQUEST)
+
+        query = make_search_query(text)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(search_catalog(query), request, view=self)
+        return paginator.get_paginated_response(build_results(page, query))
 
 
-class PaymentCreateView(APIView):
+class PaymentCreateView(RateLimitHeadersMixin, APIView):
     """Создание платежа для курса"""
     permission_classes = [IsAuthenticated]
+    query_budget = {'POST': 2}
+    # Каждый запрос — три вызова Stripe
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'payments'
 
     @swagger_auto_schema(
         operation_description="Создание платежа для оплаты курса",
@@ -211,6 +585,7 @@ class PaymentCreateView(APIView):
 class PaymentStatusView(APIView):
     """Получение статуса платежа"""
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 3}
 
     @swagger_auto_schema(
         operation_description="Получение статуса платежа по ID",
@@ -256,6 +631,7 @@ class PaymentStatusView(APIView):
 class PaymentListView(generics.ListAPIView):
     """Получение списка платежей пользователя"""
     permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 1}
 
     @swagger_auto_schema(
         operation_description="Получение списка платежей пользователя",
@@ -264,7 +640,7 @@ class PaymentListView(generics.ListAPIView):
         }
     )
     def get(self, request):
-        payments = Payment.objects.filter(user=request.user)
+        payments = Payment.objects.filter(user=request.user).select_related('course').order_by('-created_at')
         result = []
 
         for payment in payments:
@@ -280,6 +656,53 @@ class PaymentListView(generics.ListAPIView):
         return Response(result)
 
 
+class PaymentExportView(APIView):
+    """Потоковая выгрузка платежей в NDJSON или CSV"""
+    permission_classes = [IsAuthenticated]
+    query_budget = {'GET': 1}
+
+    @swagger_auto_schema(
+        operation_description="Выгрузка платежей без ограничения по объёму. Пользователь получает "
+                              "свои платежи, сотрудник - все или платежи пользователя user_id",
+        manual_parameters=[
+            openapi.Parameter('export_format', openapi.IN_QUERY, description="ndjson или csv",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('user_id', openapi.IN_QUERY, description="ID пользователя (для сотрудников)",
+                              type=openapi.TYPE_INTEGER)
+        ],
+        responses={
+            200: "Поток платежей",
+            400: "Неверные параметры"
+        }
+    )
+    def get(self, request):
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return Response({"error": "Формат должен быть ndjson или csv"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        payments = Payment.objects.all()
+        if not request.user.is_staff:
+            payments = payments.filter(user=request.user)
+        elif request.query_params.get('user_id'):
+            try:
+                payments = payments.filter(user_id=int(request.query_params['user_id']))
+            except ValueError:
+                return Response({"error": "Неверный ID пользователя"},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            iter_export(payments, export_format),
+            content_type=f'{EXPORT_FORMATS[export_format]}; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="payments.{export_format}"'
+        return response
+
+    def perform_content_negotiation(self, request, force=False):
+        # Ответ не проходит через рендереры, поэтому Accept: text/csv допустим
+        return super().perform_content_negotiation(request, force=True)
+
+
 class PaymentStatusCheckView(APIView):
     """Проверка детальной информации о платеже в Stripe"""
     permission_classes = [IsAuthenticated]
@@ -359,30 +782,30 @@ class PaymentStatusCheckView(APIView):
                             status=status.HTTP_400_BAD_REQUEST)
 
 
-class CourseListCreateView(generics.ListCreateAPIView):
+class CourseListCreateView(CourseCatalogMixin, generics.ListCreateAPIView):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
+    query_budget = {'GET': 5, 'POST': 3}
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
 
-class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CourseDetailView(CourseCatalogMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
+    query_budget = {'GET': 4, 'PATCH': 5, 'DELETE': 9}
 
-    def perform_update(self, serializer):
-        course = self.get_object()
-        four_hours_ago = timezone.now() - timedelta(hours=4)
-
-        # Сохраняем обновленный курс
-        updated_course = serializer.save()
+    def get_permissions(self):
+        """Изменять курс могут владелец и модератор, удалять — только владелец."""
+        if self.request.method in ('PUT', 'PATCH'):
+            return [IsAuthenticated(), (IsOwner | IsModerator)()]
+        if self.request.method == 'DELETE':
+            return [IsAuthenticated(), IsOwner()]
+        return super().get_permissions()
 
-        # Проверка на время последнего уведомления
-        if not course.last_notification_sent or course.last_notification_sent < four_hours_ago:
-            # Обновляем время последнего уведомления
-            updated_course.last_notification_sent = timezone.now()
-            updated_course.save(update_fields=['last_notification_sent'])
+    def perform_update(self, serializer):
+        course = serializer.save()
 
-            # Запускаем асинхронную задачу рассылки
-            send_course_update_notification.delay(updated_course.id, updated_course.title)
+        # Изменение попадает в сводку ближайшего уведомления подписчикам курса
+        record_course_change(course.id, describe_change(course, serializer.validated_data))
@@ -0,0 +1,49 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from users.cache import cache_user, get_cached_user
+from users.serializers import TOKEN_VERSION_CLAIM
+
+
+class VersionedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация, отклоняющая токены устаревшей версии."""
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        self.check_token_version(validated_token, user)
+        return user
+
+    # noinspection PyMethodMayBeStatic
+    def check_token_version(self, validated_token, user):
+        # Пользователь уже загружен, сравнение версии запросов не добавляет
+        if validated_token.get(TOKEN_VERSION_CLAIM, 0) != user.token_version:
+            raise AuthenticationFailed('Токен отозван', code='token_revoked')
+
+
+class CachedJWTAuthentication(VersionedJWTAuthentication):
+    """
+    JWT-аутентификация без запроса к базе на каждый запрос.
+
+    Пользователь берётся из кэша users.cache, база читается только при
+    промахе. Список запрета проверяется тем же обращением к кэшу.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Токен не содержит идентификатор пользователя')
+
+        user, denied = get_cached_user(user_id)
+        if denied:
+            raise AuthenticationFailed('Пользователь заблокирован', code='user_inactive')
+        if user is None:
+            # Проверка существования и is_active — в JWTAuthentication
+            user = JWTAuthentication.get_user(self, validated_token)
+            cache_user(user)
+        elif not user.is_active:
+            raise AuthenticationFailed('Пользователь заблокирован', code='user_inactive')
+
+        self.check_token_version(validated_token, user)
+        return user
@@ -0,0 +1,100 @@
+"""
+Кэш пользователей для JWT-аутентификации и список запрета.
+
+В кэше USER_CACHE_TIMEOUT секунд хранятся только поля CACHED_USER_FIELDS,
+нужные аутентификации и проверке прав: хэш пароля и личные данные базу не
+покидают. Остальные поля восстановленного пользователя отложены и читаются
+из базы при обращении. Запись удаляется при сохранении пользователя. Роли
+приходят в JWT и в кэш не попадают. Изменения через QuerySet.update() сигналов не
+отправляют, поэтому такие места сами вызывают invalidate_users или
+deny_users. Заблокированные пользователи попадают в список запрета на срок
+жизни токенов: их запросы отклоняются, даже если строка ещё в кэше.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+CACHED_USER_FIELDS = ('id', 'email', 'is_active', 'is_staff', 'is_superuser', 'token_version')
+
+
+def get_user_key(user_id):
+    return f'auth:user-fields:{user_id}'
+
+
+def get_denylist_key(user_id):
+    return f'auth:denied:{user_id}'
+
+
+def get_denylist_timeout():
+    """Срок, после которого у пользователя не остаётся действующих токенов."""
+    lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    return int(lifetime.total_seconds())
+
+
+def get_cached_user(user_id):
+    """
+    Пользователь из кэша и признак запрета одним обращением.
+
+    Возвращает (user или None, denied). При недоступном кэше — (None, False):
+    пользователь читается из базы, где is_active уже учитывает блокировку.
+    """
+    user_key, denylist_key = get_user_key(user_id), get_denylist_key(user_id)
+    try:
+        cached = cache.get_many([user_key, denylist_key])
+    except Exception as e:
+        logger.warning('Кэш пользователей недоступен: %s', e)
+        return None, False
+    values = cached.get(user_key)
+    return None if values is None else restore_user(values), denylist_key in cached
+
+
+def restore_user(values):
+    """Пользователь из закэшированных полей, как из выборки .only()."""
+    model = get_user_model()
+    # from_db ждёт значения в порядке полей модели
+    names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(DEFAULT_DB_ALIAS, names, [values[name] for name in names])
+
+
+def cache_user(user):
+    values = {name: getattr(user, name) for name in CACHED_USER_FIELDS}
+    try:
+        cache.set(get_user_key(user.pk), values, timeout=settings.USER_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.warning('Кэш пользователей недоступен: %s', e)
+
+
+def invalidate_users(user_ids):
+    """Удаляет пользователей из кэша."""
+    try:
+        cache.delete_many([get_user_key(user_id) for user_id in user_ids])
+    except Exception as e:
+        logger.warning('Кэш пользователей недоступен: %s', e)
+
+
+def deny_users(user_ids):
+    """Вносит пользователей в список запрета и удаляет их из кэша."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    try:
+        cache.set_many({get_denylist_key(user_id): True for user_id in user_ids}, timeout=get_denylist_timeout())
+    except Exception as e:
+        logger.warning('Список запрета недоступен: %s', e)
+    invalidate_users(user_ids)
+
+
+def allow_users(user_ids):
+    """Убирает пользователей из списка запрета и из кэша."""
+    user_ids = list(user_ids)
+    try:
+        cache.delete_many([get_denylist_key(user_id) for user_id in user_ids])
+    except Exception as e:
+        logger.warning('Список запрета недоступен: %s', e)
+    invalidate_users(user_ids)
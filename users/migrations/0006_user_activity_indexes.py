@@ -0,0 +1,30 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0005_delete_payment"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["last_login"],
+                name="user_active_last_login_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                condition=models.Q(("is_active", True), ("last_login__isnull", True)),
+                fields=["date_joined"],
+                name="user_active_never_logged_idx",
+            ),
+        ),
+    ]
@@ -1,8 +1,12 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.db.models import Q
 
 from config.settings import NULLABLE
 
+MODERATORS_GROUP = 'moderators'
+ROLE_MODERATOR = 'moderator'
+
 
 class UserManager(BaseUserManager):
     def _create_user(self, email, password=None, **extra_fields):
@@ -33,11 +37,32 @@ class User(AbstractUser):
     phone = models.CharField(max_length=35, verbose_name='Телефон')
     city = models.CharField(max_length=100, verbose_name='Город')
     avatar = models.ImageField(upload_to='users/', verbose_name='Аватар', **NULLABLE)
+    # Входит в JWT: увеличение отзывает все выданные токены пользователя
+    token_version = models.PositiveIntegerField(default=0, verbose_name='Версия токенов')
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Частичные индексы для deactivate_inactive_users
+            models.Index(fields=['last_login'], name='user_active_last_login_idx', condition=Q(is_active=True)),
+            models.Index(fields=['date_joined'], name='user_active_never_logged_idx',
+                         condition=Q(is_active=True, last_login__isnull=True)),
+        ]
+
+    def get_roles(self):
+        """Роли пользователя для JWT и проверки прав."""
+        if self.groups.filter(name=MODERATORS_GROUP).exists():
+            return [ROLE_MODERATOR]
+        return []
 
+    def revoke_tokens(self):
+        """Делает недействительными все выданные пользователю токены."""
+        from users.cache import invalidate_users
 
+        User.objects.filter(pk=self.pk).update(token_version=models.F('token_version') + 1)
+        self.refresh_from_db(fields=['token_version'])
+        invalidate_users([self.pk])
@@ -1,9 +1,22 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 
 from materials.models import Payment
 User = get_user_model()
 
+ROLES_CLAIM = 'roles'
+TOKEN_VERSION_CLAIM = 'ver'
+
+
+def add_role_claims(token, user):
+    """Записывает в токен роли и версию токенов пользователя."""
+    token[ROLES_CLAIM] = user.get_roles()
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+    return token
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -26,3 +39,29 @@ class PaymentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Payment
         fields = '__all__'
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Выдаёт пару токенов с ролями пользователя в claims."""
+
+    @classmethod
+    def get_token(cls, user):
+        return add_role_claims(super().get_token(user), user)
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Обновляет access-токен, заново читая роли из базы.
+
+    Refresh-токен с устаревшей версией или неактивного пользователя
+    не принимается.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: refresh.get(api_settings.USER_ID_CLAIM)}).first()
+        if user is None or not user.is_active or refresh.get(TOKEN_VERSION_CLAIM) != user.token_version:
+            raise InvalidToken('Токен отозван')
+        add_role_claims(refresh, user)
+        attrs['refresh'] = str(refresh)
+        return super().validate(attrs)
@@ -0,0 +1,55 @@
+from django.contrib.auth.models import Group
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from users.cache import allow_users, deny_users, invalidate_users
+from users.models import MODERATORS_GROUP, User
+
+
+@receiver(post_save, sender=User)
+def refresh_cached_user(sender, instance, created, **kwargs):
+    """Сохранённый пользователь перечитывается из базы при следующем запросе."""
+    if created:
+        return
+    if instance.is_active:
+        allow_users([instance.pk])
+    else:
+        deny_users([instance.pk])
+
+
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    invalidate_users([instance.pk])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def revoke_tokens_on_groups_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Токены отзываются, только если меняется роль в JWT.
+
+    Роль даёт лишь группа модераторов, поэтому изменения других групп выданные
+    токены не трогают.
+    """
+    if not reverse:
+        # Изменение со стороны пользователя: pk_set — группы
+        if action in ('post_add', 'post_remove'):
+            if Group.objects.filter(pk__in=pk_set, name=MODERATORS_GROUP).exists():
+                instance.revoke_tokens()
+        elif action == 'pre_clear':
+            instance._was_moderator = instance.groups.filter(name=MODERATORS_GROUP).exists()
+        elif action == 'post_clear' and getattr(instance, '_was_moderator', False):
+            instance.revoke_tokens()
+        return
+
+    # Изменение со стороны группы: instance — группа, pk_set — пользователи
+    if instance.name != MODERATORS_GROUP:
+        return
+    if action in ('post_add', 'post_remove'):
+        user_ids = list(pk_set)
+    elif action == 'pre_clear':
+        user_ids = list(instance.user_set.values_list('pk', flat=True))
+    else:
+        return
+    User.objects.filter(pk__in=user_ids).update(token_version=F('token_version') + 1)
+    invalidate_users(user_ids)
@@ -1,4 +0,0 @@
-# Импортируем все тесты для обнаружения Django
-from .test_views import *
-from .test_serializers import *
-from .test_models import *
\ No newline at end of file
@@ -0,0 +1,102 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from materials.tasks import deactivate_inactive_users
+from users.cache import CACHED_USER_FIELDS, get_cached_user, get_user_key
+from users.serializers import RoleTokenObtainPairSerializer
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CachedJWTAuthenticationTestCase(APITestCase):
+    """Тесты JWT-аутентификации с кэшем пользователей и списком запрета."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='password'
+        )
+        self.authenticate(self.user)
+
+    def authenticate(self, user):
+        access = RoleTokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def get_user_queries(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/payment/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [query for query in captured if 'FROM "users_user"' in query['sql']]
+
+    def test_user_cached(self):
+        """Пользователь читается из базы только при первом запросе."""
+        self.assertEqual(len(self.get_user_queries()), 1)
+        self.assertEqual(self.get_user_queries(), [])
+
+    def test_cached_fields(self):
+        """В кэше только поля для аутентификации, остальные читаются из базы по обращению."""
+        self.get_user_queries()
+
+        self.assertEqual(set(cache.get(get_user_key(self.user.pk))), set(CACHED_USER_FIELDS))
+        user, denied = get_cached_user(self.user.pk)
+        self.assertFalse(denied)
+        self.assertEqual((user.pk, user.email, user.token_version), (self.user.pk, 'test@example.com', 0))
+        self.assertEqual(user.get_deferred_fields(), {field.attname for field in User._meta.concrete_fields}
+                         - set(CACHED_USER_FIELDS))
+        self.assertTrue(user.check_password('password'))
+
+    def test_save_invalidates(self):
+        """Сохранение пользователя удаляет его из кэша."""
+        self.get_user_queries()
+        self.user.city = 'Казань'
+        self.user.save()
+
+        self.assertEqual(len(self.get_user_queries()), 1)
+
+    def test_deactivated_user_denied(self):
+        """Заблокированный задачей пользователь отклоняется сразу."""
+        self.get_user_queries()
+        User.objects.filter(pk=self.user.pk).update(last_login=timezone.now() - timedelta(days=31))
+
+        deactivate_inactive_users.apply()
+
+        response = self.client.get('/api/payment/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_reactivated_user_allowed(self):
+        """После разблокировки пользователь снова проходит аутентификацию."""
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/payment/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self.client.get('/api/payment/').status_code, status.HTTP_200_OK)
+
+    def test_revoked_token_rejected(self):
+        """Отзыв токенов действует и для закэшированного пользователя."""
+        self.get_user_queries()
+        self.user.revoke_tokens()
+
+        response = self.client.get('/api/payment/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cache_unavailable(self):
+        """При недоступном кэше пользователь читается из базы."""
+        with mock.patch('users.cache.cache.get_many', side_effect=ConnectionError):
+            self.assertEqual(len(self.get_user_queries()), 1)
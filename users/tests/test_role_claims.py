@@ -0,0 +1,132 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from materials.models import Course, Lesson
+from materials.permissions import IsModerator, ModeratorOrOwner, NotModerator
+
+User = get_user_model()
+
+
+class RoleClaimsTestCase(APITestCase):
+    """Тесты ролей в JWT и отзыва токенов по версии."""
+
+    def setUp(self):
+        """Настройка тестового окружения."""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='user@example.com',
+            password='password'
+        )
+        self.moderator_group = Group.objects.create(name='moderators')
+        self.moderator = User.objects.create_user(
+            email='mod@example.com',
+            password='password'
+        )
+        self.moderator.groups.add(self.moderator_group)
+        self.moderator.refresh_from_db()
+
+        course = Course.objects.create(title='Курс', description='Описание', owner=self.user)
+        self.lesson = Lesson.objects.create(title='Урок', description='Описание', course=course,
+                                            owner=self.user)
+
+    def obtain(self, email):
+        response = self.client.post('/api/token/', {'email': email, 'password': 'password'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_token_contains_roles(self):
+        """Токен модератора содержит роль и текущую версию."""
+        access = AccessToken(self.obtain('mod@example.com')['access'])
+        self.assertEqual(access['roles'], ['moderator'])
+        self.assertEqual(access['ver'], self.moderator.token_version)
+
+        access = AccessToken(self.obtain('user@example.com')['access'])
+        self.assertEqual(access['roles'], [])
+
+    @mock.patch('materials.views.record_course_change')
+    def test_permission_check_without_group_query(self, mock_notification):
+        """С JWT проверка прав модератора не обращается к группам."""
+        access = self.obtain('mod@example.com')['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.patch(f'/api/lessons/{self.lesson.id}/update/', {'title': 'Новое'},
+                                         format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in captured if 'auth_group' in query['sql']])
+
+    def test_groups_change_revokes_tokens(self):
+        """Изменение групп делает выданные токены недействительными."""
+        tokens = self.obtain('mod@example.com')
+        self.moderator.groups.remove(self.moderator_group)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+        response = self.client.get('/api/lessons/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials()
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_group_side_change_revokes_tokens(self):
+        """Добавление пользователей со стороны группы тоже отзывает токены."""
+        version = self.user.token_version
+        self.moderator_group.user_set.add(self.user)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, version + 1)
+
+    def test_other_group_change_keeps_tokens(self):
+        """Группы, не дающие роли, на выданные токены не влияют."""
+        group = Group.objects.create(name='students')
+        version = self.moderator.token_version
+
+        self.moderator.groups.add(group)
+        group.user_set.add(self.user)
+        self.moderator.groups.remove(group)
+        group.user_set.clear()
+
+        self.moderator.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(self.moderator.token_version, version)
+        self.assertEqual(self.user.token_version, 0)
+
+    def test_groups_clear_revokes_tokens(self):
+        """Очистка групп модератора отзывает токены, остальных пользователей — нет."""
+        version = self.moderator.token_version
+        self.moderator.groups.clear()
+        self.user.groups.clear()
+
+        self.moderator.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(self.moderator.token_version, version + 1)
+        self.assertEqual(self.user.token_version, 0)
+
+    def test_refresh_reissues_roles(self):
+        """Обновление выдаёт access-токен с ролями из базы."""
+        tokens = self.obtain('user@example.com')
+
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        access = AccessToken(response.data['access'])
+        self.assertEqual(access['roles'], [])
+        self.assertEqual(access['ver'], self.user.token_version)
+
+    def test_fallback_roles_memoized(self):
+        """Без токена роли читаются из базы один раз за запрос."""
+        request = type('Request', (), {'user': self.moderator})()
+
+        with CaptureQueriesContext(connection) as captured:
+            self.assertTrue(IsModerator().has_permission(request, None))
+            self.assertFalse(NotModerator().has_permission(request, None))
+            self.assertTrue(ModeratorOrOwner().has_object_permission(request, None, self.lesson))
+
+        self.assertEqual(len(captured), 1)